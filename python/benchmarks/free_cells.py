@@ -0,0 +1,44 @@
+"""Grid free-cell index benchmark.
+
+Measures the cost of one simulated tick (new head added, tail removed, food
+spawned) on boards of growing size. With the free-cell index the cost per
+tick should stay flat as the board grows.
+
+Run from the python directory: python -m benchmarks.free_cells
+"""
+
+from time import perf_counter
+
+from objects.food import FoodFactory
+from objects.grid import Grid
+from objects.renderers.renderer import Renderer
+from objects.snake import SnakeTile
+
+BOARD_SIZES = [21, 100, 500, 1000]
+TICKS = 20000
+
+
+def bench_ticks(board_size: int, ticks: int = TICKS) -> float:
+    renderer = Renderer(window_width=board_size, window_height=board_size)
+    grid = Grid(row_count=board_size, col_count=board_size, renderer=renderer)
+    food_factory = FoodFactory()
+
+    start = perf_counter()
+    for tick in range(ticks):
+        x, y = tick % board_size, (tick // board_size) % board_size
+        grid.add_tile(SnakeTile(x=x, y=y))
+        grid.remove_tile(x=x, y=y)
+        food_factory.spawn_food(grid.empty_positions)
+        grid.updated_cells.clear()
+    return (perf_counter() - start) / ticks
+
+
+def main():
+    print(f"{'board':>12} {'us/tick':>10}")
+    for board_size in BOARD_SIZES:
+        tick_cost = bench_ticks(board_size)
+        print(f"{f'{board_size}x{board_size}':>12} {tick_cost * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Grid memory benchmark.
+
+Measures the memory held per cell by a grid in which every cell has been
+taken by the snake and freed again, as after a long game. Then measures
+the creation time of chunked grids and their memory with a snake on them,
+which should depend on the snake rather than on the board. Last, measures
+what a drawn game allocates per tick: bytes kept, bytes allocated and
+freed within the tick, and how often that triggers the garbage collector.
+
+Run from the python directory: python -m benchmarks.memory
+"""
+
+import gc
+import tracemalloc
+from random import Random
+from time import perf_counter
+from typing import Tuple
+
+from objects.bots import greedy_bot
+from objects.chunked_grid import ChunkedGrid
+from objects.engine import GameEngine, GameState
+from objects.food import FoodFactory
+from objects.grid import Grid
+from objects.renderers.renderer import Renderer
+from objects.snake import Snake, SnakeTile
+
+BOARD_SIZES = [21, 100, 500, 1000]
+CHUNKED_BOARD_SIZES = [1000, 10000, 100000]
+SNAKE_LENGTHS = [1, 10000]
+TICK_BOARD_SIZES = [21, 100]
+WARMUP_TICKS = 200
+MEASURED_TICKS = 5000
+
+
+def grid_bytes_per_cell(board_size: int) -> float:
+    tracemalloc.start()
+    renderer = Renderer(window_width=board_size, window_height=board_size)
+    grid = Grid(row_count=board_size, col_count=board_size, renderer=renderer, track_updates=False)
+    for y in range(board_size):
+        for x in range(board_size):
+            grid.add_tile(SnakeTile(x=x, y=y))
+            grid.remove_tile(x=x, y=y)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / board_size ** 2
+
+
+def chunked_grid_footprint(board_size: int, snake_length: int) -> Tuple[float, int]:
+    """Seconds to create a chunked grid, and bytes held once the snake is on it."""
+    tracemalloc.start()
+    start = perf_counter()
+    renderer = Renderer(window_width=board_size, window_height=board_size)
+    grid = ChunkedGrid(row_count=board_size, col_count=board_size, renderer=renderer, track_updates=False)
+    creation_time = perf_counter() - start
+    for index in range(snake_length):
+        grid.add_tile(SnakeTile(*divmod(index, board_size)[::-1]))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return creation_time, current
+
+
+def tick_allocations(board_size: int, chunked: bool) -> Tuple[float, float, float]:
+    """Bytes kept and mean peak bytes allocated per tick of a drawn game,
+    and young generation collections per 1000 ticks."""
+    renderer = Renderer(window_width=board_size, window_height=board_size)
+    grid_type = ChunkedGrid if chunked else Grid
+    grid = grid_type(row_count=board_size, col_count=board_size, renderer=renderer)
+    engine = GameEngine(grid=grid, snake=Snake(initial_x=board_size // 2, initial_y=board_size // 2),
+                        food_factory=FoodFactory(), seed=0)
+    rng = Random(0)
+    resets = 0
+
+    def tick():
+        nonlocal resets
+        if engine.step(greedy_bot(engine, rng))[0] == GameState.GAME_STOPPED:
+            resets += 1
+            engine.reset(seed=resets)
+        grid.draw()
+
+    for _ in range(WARMUP_TICKS):
+        tick()
+
+    collections = gc.get_stats()[0]["collections"]
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    peaks = 0
+    for _ in range(MEASURED_TICKS):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        tick()
+        _, peak = tracemalloc.get_traced_memory()
+        peaks += peak - before
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    collections = gc.get_stats()[0]["collections"] - collections
+    return ((end - start) / MEASURED_TICKS, peaks / MEASURED_TICKS,
+            collections * 1000 / MEASURED_TICKS)
+
+
+def main():
+    print(f"{'board':>12} {'bytes/cell':>12}")
+    for board_size in BOARD_SIZES:
+        print(f"{f'{board_size}x{board_size}':>12} {grid_bytes_per_cell(board_size):>12.2f}")
+
+    print(f"\n{'chunked board':>14} {'snake':>6} {'create us':>10} {'kB':>10}")
+    for board_size in CHUNKED_BOARD_SIZES:
+        for snake_length in SNAKE_LENGTHS:
+            creation_time, memory = chunked_grid_footprint(board_size, snake_length)
+            print(f"{f'{board_size}x{board_size}':>14} {snake_length:>6} "
+                  f"{creation_time * 1e6:>10.1f} {memory / 1000:>10.1f}")
+
+    print(f"\n{'ticks on':>14} {'kept B/tick':>12} {'peak B/tick':>12} {'gen0 gc/1k':>11}")
+    for board_size in TICK_BOARD_SIZES:
+        for chunked in (False, True):
+            kept, peak, collections = tick_allocations(board_size, chunked)
+            name = f"{'chunked ' if chunked else ''}{board_size}x{board_size}"
+            print(f"{name:>14} {kept:>12.1f} {peak:>12.1f} {collections:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
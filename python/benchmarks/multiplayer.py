@@ -0,0 +1,103 @@
+"""Multiplayer server load benchmark.
+
+Runs the game server in a child process and connects bot clients to it
+over loopback from this one. Reports the server's time per tick and CPU
+use, and whether every client kept up with the tick rate.
+
+Run from the python directory: python -m benchmarks.multiplayer --clients 100 500
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import sys
+import time
+from random import Random
+from typing import Dict, List
+
+from objects.multiplayer import MultiplayerEngine
+from objects.netplay import GameClient, GameServer, MessageType
+from objects.snake import SnakeDirection
+
+CLIENT_COUNTS = [10, 100, 500]
+DIRECTIONS = [SnakeDirection.UP, SnakeDirection.DOWN, SnakeDirection.LEFT, SnakeDirection.RIGHT]
+# Ticks given to clients to connect before measuring
+WARMUP_TICKS = 20
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(port: int, board_size: int, tick_rate: float, ticks: int, results: multiprocessing.Queue):
+    engine = MultiplayerEngine.headless(board_size, board_size, seed=0)
+    server = GameServer(engine=engine, tick_rate=tick_rate)
+    start = time.process_time()
+    asyncio.run(server.serve("127.0.0.1", port, ticks))
+    results.put({**vars(server.stats), "mean_time": server.stats.mean_time,
+                 "missed_deadlines": server.scheduler.stats.missed_deadlines,
+                 "cpu_time": time.process_time() - start})
+
+
+async def bot(port: int, seed: int) -> Dict[str, int]:
+    for _ in range(50):
+        try:
+            client = await asyncio.wait_for(GameClient.connect("127.0.0.1", port), timeout=5)
+            break
+        except (ConnectionError, asyncio.TimeoutError):
+            await asyncio.sleep(0.05)
+    else:
+        raise ConnectionError(f"Can't connect to port {port}")
+
+    rng = Random(seed)
+    deltas = 0
+    first_tick = client.tick_count
+    while (message := await client.receive()) is not None:
+        if message == MessageType.DELTA:
+            deltas += 1
+            if rng.random() < 0.2:
+                client.send_direction(rng.choice(DIRECTIONS))
+    await client.close()
+    return {"deltas": deltas, "ticks": client.tick_count - first_tick}
+
+
+async def run_clients(port: int, client_count: int) -> List[Dict[str, int]]:
+    return await asyncio.gather(*(bot(port, seed) for seed in range(client_count)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", nargs="+", type=int, default=CLIENT_COUNTS)
+    parser.add_argument("--board-size", type=int, default=200)
+    parser.add_argument("--tick-rate", type=float, default=20)
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    failures = 0
+    print(f"{'clients':>8} {'mean ms':>8} {'max ms':>8} {'cpu %':>6} {'missed':>7} "
+          f"{'kB/tick':>8} {'behind':>7}")
+    for client_count in args.clients:
+        port = free_port()
+        results: multiprocessing.Queue = multiprocessing.Queue()
+        server = multiprocessing.Process(target=serve, args=(port, args.board_size, args.tick_rate,
+                                                            args.ticks + WARMUP_TICKS, results))
+        server.start()
+        clients = asyncio.run(run_clients(port, client_count))
+        stats = results.get()
+        server.join()
+
+        # Clients that missed ticks, other than those before they joined
+        behind = sum(client["deltas"] < client["ticks"] for client in clients)
+        failures += behind
+        duration = stats["ticks"] / args.tick_rate
+        print(f"{client_count:>8} {stats['mean_time'] * 1000:>8.2f} {stats['max_time'] * 1000:>8.2f} "
+              f"{stats['cpu_time'] / duration * 100:>6.1f} {stats['missed_deadlines']:>7} "
+              f"{stats['bytes_broadcast'] / stats['ticks'] / 1000:>8.1f} {behind:>7}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Startup import benchmark.
+
+Runs each startup path in a fresh interpreter with python -X importtime
+and reports the total import time and which heavy backends it loaded.
+The headless path must load none of them.
+
+Run from the python directory: python -m benchmarks.startup
+"""
+
+import os
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+# Modules too slow to import, or too often missing, for paths not using them
+HEAVY_MODULES = ["pygame", "tkinter", "turtle", "rich", "numpy"]
+
+STARTUP_PATHS: Dict[str, str] = {
+    "headless": ("from objects.engine import GameEngine\n"
+                 "import snakegame, tournament\n"
+                 "GameEngine.headless(21, 21, seed=0).step(None)"),
+    "terminal": ("import snakegame\n"
+                 "from objects.renderers.rendererfactory import RendererFactory, RendererType\n"
+                 "RendererFactory.get_renderer(21, 21, type=RendererType.TERMINAL)"),
+    "pygame": ("import snakegame\n"
+               "from objects.inputs.inputhandlerfactory import InputHandlerFactory\n"
+               "from objects.renderers.rendererfactory import RendererFactory, RendererType\n"
+               "RendererFactory.get_renderer(630, 630, type=RendererType.PYGAME)\n"
+               "InputHandlerFactory.get_input_handler('keyboard')"),
+}
+
+# Startup paths that must not load any heavy module
+HEADLESS_PATHS = ["headless"]
+
+
+def import_times(code: str) -> Tuple[List[Tuple[str, int]], Set[str]]:
+    """Top level modules imported by code with their cumulative time in us,
+    and every module imported, nested ones included."""
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             env=env, capture_output=True, text=True, check=True)
+    times = list()
+    imported = set()
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imported.add(name.strip())
+        # Nested imports are indented, their time is included in their parent's
+        if not name.startswith("  "):
+            times.append((name.strip(), int(cumulative)))
+    return times, imported
+
+
+def main():
+    failures = 0
+    print(f"{'path':>10} {'import ms':>10}  heavy modules")
+    for name, code in STARTUP_PATHS.items():
+        times, imported = import_times(code)
+        modules = {module.split(".")[0] for module in imported}
+        heavy = [module for module in HEAVY_MODULES if module in modules]
+        total = sum(cumulative for _, cumulative in times) / 1000
+        print(f"{name:>10} {total:>10.1f}  {', '.join(heavy) or '-'}")
+        if name in HEADLESS_PATHS and heavy:
+            failures += 1
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
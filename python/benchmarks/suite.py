@@ -0,0 +1,321 @@
+"""Engine and renderer benchmark suite.
+
+Every benchmark plays a scripted game: the snake follows a cycle through
+the whole board, so it never runs into itself, and the food is seeded so
+that each run does the same work. Timings are written as JSON tagged with
+the git commit, and --compare prints the change against an earlier file.
+
+Run from the python directory: python -m benchmarks --output results.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from statistics import median
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from objects.engine import GameState
+from objects.food import FoodFactory
+from objects.grid import Grid
+from objects.inputs.inputs import INPUT_DIRECTIONS, Inputs
+from objects.inputs.scripted_input_handler import ScriptedInputHandler
+from objects.renderers.renderer import Renderer
+from objects.snake import Snake, SnakeDirection, SnakeTile
+from snakegame import SnakeGame
+
+BOARD_SIZES = [21, 100, 500, 1000, 2000]
+SNAKE_LENGTHS = [1, 100, 10000]
+TICKS = 2000
+REPEAT = 5
+# Largest window the renderer benchmarks open, in pixels
+MAX_WINDOW_SIZE = 1000
+
+DIRECTION_INPUTS = {direction: input for input, direction in INPUT_DIRECTIONS.items()
+                    if input in (Inputs.UP, Inputs.DOWN, Inputs.LEFT, Inputs.RIGHT)}
+
+# A tick function does the work measured for one game tick
+Tick = Callable[[], None]
+Benchmark = Callable[[int, int, int], Tick]
+
+
+def cycle_rows(board_size: int) -> int:
+    # The cycle needs an even number of rows, the last row of odd boards
+    # is left out
+    return board_size - board_size % 2
+
+
+def cycle_length(board_size: int) -> int:
+    return cycle_rows(board_size) * board_size
+
+
+def cycle_position(index: int, board_size: int) -> Tuple[int, int]:
+    """Position of the cell at index along the board cycle.
+
+    The cycle sweeps columns 1 and beyond row after row, then comes
+    back to the first row along column 0.
+    """
+    rows = cycle_rows(board_size)
+    row_length = board_size - 1
+    index %= cycle_length(board_size)
+    if index >= rows * row_length:
+        return 0, rows - 1 - (index - rows * row_length)
+    row, offset = divmod(index, row_length)
+    return (1 + offset if row % 2 == 0 else row_length - offset), row
+
+
+def next_cycle_direction(x: int, y: int, board_size: int) -> SnakeDirection:
+    rows = cycle_rows(board_size)
+    if x == 0:
+        return SnakeDirection.RIGHT if y == 0 else SnakeDirection.UP
+    if y % 2 == 0:
+        return SnakeDirection.RIGHT if x < board_size - 1 else SnakeDirection.DOWN
+    if x > 1:
+        return SnakeDirection.LEFT
+    return SnakeDirection.LEFT if y == rows - 1 else SnakeDirection.DOWN
+
+
+def cycle_snake(board_size: int, snake_length: int) -> Snake:
+    """Snake laid along the board cycle, head first."""
+    segments = [SnakeTile(*cycle_position(index, board_size))
+                for index in range(snake_length - 1, -1, -1)]
+    head = segments[0]
+    return Snake(initial_x=head.x, initial_y=head.y, segments=segments)
+
+
+def cycle_inputs(snake: Snake, board_size: int):
+    """Endless input script keeping the snake on the board cycle."""
+    while True:
+        direction = next_cycle_direction(snake.x, snake.y, board_size)
+        yield [] if direction == snake.direction else [DIRECTION_INPUTS[direction]]
+
+
+class NullStream(io.TextIOBase):
+    def write(self, text: str) -> int:
+        return len(text)
+
+
+def null_renderer(board_size: int) -> Renderer:
+    return Renderer(window_width=board_size, window_height=board_size)
+
+
+def cycle_game(board_size: int, snake_length: int, seed: int,
+               renderer: Optional[Renderer] = None) -> SnakeGame:
+    renderer = renderer or null_renderer(board_size)
+    snake = cycle_snake(board_size, snake_length)
+    grid = Grid(row_count=board_size, col_count=board_size, renderer=renderer)
+    return SnakeGame(grid=grid, snake=snake, food_facory=FoodFactory(),
+                     input_handler=ScriptedInputHandler(cycle_inputs(snake, board_size)),
+                     seed=seed)
+
+
+def game_tick(game: SnakeGame) -> Tick:
+    # SnakeGame.__update is what the game loop runs every tick, called here
+    # without the scheduler
+    update = game._SnakeGame__update
+
+    def tick():
+        game.input_handler.pump(game.inputs)
+        update()
+        if game.engine.game_state == GameState.GAME_STOPPED:
+            # The snake filled the board
+            game.engine.reset(game.seed)
+
+    return tick
+
+
+def bench_snake_update(board_size: int, snake_length: int, seed: int) -> Tick:
+    snake = cycle_snake(board_size, snake_length)
+
+    def tick():
+        snake.direction = next_cycle_direction(snake.x, snake.y, board_size)
+        snake.update(food_x=-1, food_y=-1)
+
+    return tick
+
+
+def bench_grid_tiles(board_size: int, snake_length: int, seed: int) -> Tick:
+    grid = Grid(row_count=board_size, col_count=board_size, renderer=null_renderer(board_size))
+    for index in range(snake_length):
+        grid.add_tile(SnakeTile(*cycle_position(index, board_size)))
+    head_index = snake_length - 1
+
+    def tick():
+        nonlocal head_index
+        head_index += 1
+        grid.add_tile(SnakeTile(*cycle_position(head_index, board_size)))
+        grid.remove_tile(*cycle_position(head_index - snake_length, board_size))
+        grid.updated_cells.clear()
+
+    return tick
+
+
+def bench_spawn_food(board_size: int, snake_length: int, seed: int) -> Tick:
+    grid = Grid(row_count=board_size, col_count=board_size, renderer=null_renderer(board_size))
+    for index in range(snake_length):
+        grid.add_tile(SnakeTile(*cycle_position(index, board_size)))
+    food_factory = FoodFactory()
+    food_factory.seed(seed)
+
+    def tick():
+        food_factory.spawn_food(grid.empty_positions)
+
+    return tick
+
+
+def bench_game_update(board_size: int, snake_length: int, seed: int) -> Tick:
+    return game_tick(cycle_game(board_size, snake_length, seed))
+
+
+def frame_tick(game: SnakeGame) -> Tick:
+    update = game_tick(game)
+    game.grid.draw()
+
+    def tick():
+        update()
+        game.grid.draw()
+
+    return tick
+
+
+def bench_frame_null(board_size: int, snake_length: int, seed: int) -> Tick:
+    return frame_tick(cycle_game(board_size, snake_length, seed))
+
+
+def window_size(board_size: int) -> int:
+    return board_size * max(1, MAX_WINDOW_SIZE // board_size)
+
+
+def bench_frame_pygame(board_size: int, snake_length: int, seed: int) -> Tick:
+    from objects.renderers.pygame_renderer import PygameRenderer
+
+    size = window_size(board_size)
+    renderer = PygameRenderer(window_width=size, window_height=size)
+    return frame_tick(cycle_game(board_size, snake_length, seed, renderer))
+
+
+def bench_frame_terminal(board_size: int, snake_length: int, seed: int) -> Tick:
+    from objects.renderers.terminal_renderer import TerminalRenderer
+
+    renderer = TerminalRenderer(window_width=board_size, window_height=board_size,
+                                stream=NullStream())
+    return frame_tick(cycle_game(board_size, snake_length, seed, renderer))
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "snake_update": bench_snake_update,
+    "grid_tiles": bench_grid_tiles,
+    "spawn_food": bench_spawn_food,
+    "game_update": bench_game_update,
+    "frame_null": bench_frame_null,
+    "frame_pygame": bench_frame_pygame,
+    "frame_terminal": bench_frame_terminal,
+}
+
+
+def run(benchmark: Benchmark, board_size: int, snake_length: int,
+        seed: int, ticks: int, repeat: int) -> List[float]:
+    """Seconds per tick of each repetition, each on a fresh setup."""
+    timings = list()
+    for _ in range(repeat):
+        tick = benchmark(board_size, snake_length, seed)
+        start = perf_counter()
+        for _ in range(ticks):
+            tick()
+        timings.append((perf_counter() - start) / ticks)
+    return timings
+
+
+def git_commit() -> Tuple[Optional[str], bool]:
+    """Current commit and whether tracked files have local changes."""
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=cwd, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=cwd,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, bool(status.strip())
+
+
+def result_key(result: Dict) -> Tuple[str, int, int]:
+    return result["benchmark"], result["board_size"], result["snake_length"]
+
+
+def compare(results: List[Dict], baseline_path: str):
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    baseline_results = {result_key(result): result for result in baseline["results"]}
+    print(f"\nCompared to {baseline.get('commit') or baseline_path}:")
+    for result in results:
+        before = baseline_results.get(result_key(result))
+        if before is None:
+            continue
+        ratio = result["best_us_per_tick"] / before["best_us_per_tick"]
+        print(f"{result['benchmark']:>15} {result['board_size']:>5} {result['snake_length']:>6} "
+              f"{before['best_us_per_tick']:>10.2f} -> {result['best_us_per_tick']:>10.2f} us "
+              f"({(ratio - 1) * 100:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--benchmarks", nargs="+", default=list(BENCHMARKS), choices=list(BENCHMARKS))
+    parser.add_argument("--board-sizes", nargs="+", type=int, default=BOARD_SIZES)
+    parser.add_argument("--snake-lengths", nargs="+", type=int, default=SNAKE_LENGTHS)
+    parser.add_argument("--ticks", type=int, default=TICKS, help="ticks timed per repetition")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = list()
+    print(f"{'benchmark':>15} {'board':>5} {'length':>6} {'best us':>10} {'median us':>10}")
+    for name in args.benchmarks:
+        for board_size in args.board_sizes:
+            for snake_length in args.snake_lengths:
+                if snake_length >= cycle_length(board_size):
+                    continue
+                timings = run(BENCHMARKS[name], board_size, snake_length,
+                              args.seed, args.ticks, args.repeat)
+                result = {
+                    "benchmark": name,
+                    "board_size": board_size,
+                    "snake_length": snake_length,
+                    "best_us_per_tick": min(timings) * 1e6,
+                    "median_us_per_tick": median(timings) * 1e6,
+                }
+                results.append(result)
+                print(f"{name:>15} {board_size:>5} {snake_length:>6} "
+                      f"{result['best_us_per_tick']:>10.2f} {result['median_us_per_tick']:>10.2f}")
+
+    commit, dirty = git_commit()
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({
+                "commit": commit,
+                "dirty": dirty,
+                "date": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "config": vars(args),
+                "results": results,
+            }, output, indent=2)
+
+    if args.compare:
+        compare(results, args.compare)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2 @@
+# Puts this directory on sys.path, so that tests import objects like the
+# game does
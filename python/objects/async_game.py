@@ -0,0 +1,84 @@
+import logging
+from dataclasses import dataclass
+from typing import List
+
+from .engine import GameEngine, GameEvent, GameState
+from .inputs.input_buffer import CoalescingPolicy, InputBuffer, InputLatencyStats
+from .inputs.input_handler import InputHandler
+from .inputs.inputs import INPUT_DIRECTIONS, Inputs
+from .scheduler import FixedTimestepScheduler
+
+log = logging.getLogger(__package__)
+
+
+@dataclass
+class AsyncSnakeGame:
+    """Real-time game running as a coroutine.
+
+    Waiting for the next tick, for inputs and for frame presentation all
+    yield to the event loop, so many games and other services can share a
+    single thread. run() returns when the game is over instead of exiting
+    the process.
+    """
+    engine: GameEngine
+    input_handler: InputHandler
+    input_coalescing: CoalescingPolicy = CoalescingPolicy.ONE_PER_TICK
+
+    def __post_init__(self):
+        self.game_state = GameState.GAME_INIT
+        self.input_handler.attach(self.engine)
+        self.inputs = InputBuffer()
+        self.input_latency = InputLatencyStats()
+        self.scheduler = FixedTimestepScheduler(tick_rate=self.engine.snake_speed)
+
+    async def __get_inputs(self) -> List[Inputs]:
+        inputs = await self.input_handler.get_latest_inputs_async()
+        timestamp = self.inputs.clock()
+        for input in inputs:
+            self.inputs.push(input, timestamp)
+        return inputs
+
+    def __update(self) -> GameEvent:
+        now = self.inputs.clock()
+        for event in self.inputs.drain(self.input_coalescing):
+            self.input_latency.record(now - event.timestamp)
+            self.engine.snake.direction = INPUT_DIRECTIONS[event.input]
+
+        _, game_event = self.engine.step()
+        return game_event
+
+    async def run(self):
+        self.game_state = GameState.GAME_RUNNING
+        await self.engine.grid.draw_async()
+        self.scheduler.restart()
+
+        while self.game_state == GameState.GAME_RUNNING:
+            if Inputs.QUIT in await self.__get_inputs():
+                break
+
+            updated = False
+            while self.game_state == GameState.GAME_RUNNING and self.scheduler.tick_due():
+                game_event = self.__update()
+                if game_event == GameEvent.GAME_OVER:
+                    log.info("Game over")
+                    self.game_state = GameState.GAME_STOPPED
+                if game_event == GameEvent.SPEED_UP:
+                    self.scheduler.tick_rate = self.engine.snake_speed
+                updated = True
+
+            if updated:
+                await self.engine.grid.draw_async()
+
+            if self.game_state != GameState.GAME_RUNNING:
+                break
+            if self.input_handler.reads_engine:
+                # Its inputs only change once the next tick has run
+                await self.scheduler.wait_next_tick()
+            else:
+                await self.input_handler.wait_for_inputs_async(
+                    self.scheduler.time_until_next_tick())
+
+        self.game_state = GameState.GAME_STOPPED
+
+    def stop(self):
+        self.game_state = GameState.GAME_STOPPED
@@ -0,0 +1,275 @@
+from collections import deque
+from dataclasses import dataclass, field
+from heapq import heappop, heappush
+from itertools import islice
+from time import perf_counter
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from .engine import GameEngine
+from .snake import SnakeDirection
+
+Position = Tuple[int, int]
+
+MOVES = {
+    SnakeDirection.UP: (0, -1),
+    SnakeDirection.DOWN: (0, 1),
+    SnakeDirection.LEFT: (-1, 0),
+    SnakeDirection.RIGHT: (1, 0),
+}
+
+# Cells expanded between two looks at the clock
+CLOCK_CHECK_INTERVAL = 16
+# Fraction of the time budget kept from the searches, for turning what
+# they found into a path
+PATH_TIME_FRACTION = 0.1
+
+
+@dataclass
+class PlanningStats:
+    ticks: int = 0
+    total_time: float = 0
+    max_time: float = 0
+    # Ticks that took longer than their budget
+    over_budget: int = 0
+    # Searches for a path to the food
+    searches: int = 0
+    # Moves toward the most promising cell of a search that ran out of time
+    partial_moves: int = 0
+    # Moves picked by the cheap heuristic because the search found no path
+    # or eating would have trapped the snake
+    fallback_moves: int = 0
+    # Paths to the food taken although their tail check ran out of time
+    unverified_paths: int = 0
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.ticks if self.ticks else 0
+
+    def record_tick(self, elapsed: float, budget: Optional[float]):
+        self.ticks += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        if budget is not None and elapsed > budget:
+            self.over_budget += 1
+
+
+@dataclass
+class PathSearch:
+    """A* search toward food, kept between ticks until it gets there."""
+    food: Position
+    # Cells are keyed by index: int only containers stay out of the
+    # garbage collector's way on large boards
+    parents: Dict[int, int]
+    distances: Dict[int, int]
+    # Heap of (estimated path length, -distance, x, y), deeper cells first
+    # among equal estimates
+    frontier: List[Tuple[int, int, int, int]] = field(default_factory=list)
+    complete: bool = False
+
+
+@dataclass
+class Autopilot:
+    """Plans the snake's moves toward the food within a time budget.
+
+    Paths are found with A* from the head to the food. The body only
+    changes at its ends, the head walking the path and the tail freeing
+    cells, so a path stays valid until the food moves or the snake strays
+    from it: it's reused tick after tick with a constant time check. When a
+    search runs out of time, the snake moves toward the most promising cell
+    found so far and searches again from there on the next tick. Before
+    committing to a path, the planner checks that the tail can still be
+    reached once the food is eaten.
+    """
+    engine: GameEngine
+    clock: Callable[[], float] = perf_counter
+
+    stats: PlanningStats = field(default_factory=PlanningStats)
+
+    def __post_init__(self):
+        self.path: Deque[Position] = deque()
+        self.path_food: Optional[Position] = None
+        self.search: Optional[PathSearch] = None
+
+    def __is_free(self, x: int, y: int) -> bool:
+        return (0 <= x < self.engine.grid.col_count and 0 <= y < self.engine.grid.row_count
+                and not self.engine.snake.occupies(x, y))
+
+    def __safe_moves(self) -> Dict[Position, SnakeDirection]:
+        snake = self.engine.snake
+        moves = dict()
+        for direction, (x_delta, y_delta) in MOVES.items():
+            if snake.forbiden_moves[snake.direction] == direction:
+                continue
+            x, y = snake.x + x_delta, snake.y + y_delta
+            if self.__is_free(x, y):
+                moves[(x, y)] = direction
+        return moves
+
+    def __out_of_time(self, start: float, expanded: int, deadline: Optional[float]) -> bool:
+        """Whether expanding CLOCK_CHECK_INTERVAL more cells, as fast as the
+        cells expanded since start, would end past deadline."""
+        if deadline is None:
+            return False
+        now = self.clock()
+        if not expanded:
+            return now > deadline
+        return now + (now - start) * CLOCK_CHECK_INTERVAL / expanded > deadline
+
+    def __start_search(self, moves: Dict[Position, SnakeDirection], food: Position) -> PathSearch:
+        self.stats.searches += 1
+        col_count = self.engine.grid.col_count
+        food_x, food_y = food
+        head = self.engine.snake.y * col_count + self.engine.snake.x
+        search = PathSearch(food=food, parents={head: -1}, distances={head: 0})
+        for x, y in moves:
+            search.distances[y * col_count + x] = 1
+            search.parents[y * col_count + x] = head
+            heappush(search.frontier, (1 + abs(x - food_x) + abs(y - food_y), -1, x, y))
+        return search
+
+    def __extend(self, search: PathSearch, deadline: Optional[float]) -> List[Position]:
+        """Carries on with search, and returns the path from the head to
+        the food, or to the frontier cell with the best estimate when time
+        runs out. The path is empty when the food can't be reached or the
+        head has left the paths searched so far.
+        """
+        col_count = self.engine.grid.col_count
+        food_x, food_y = search.food
+        parents = search.parents
+        distances = search.distances
+        frontier = search.frontier
+
+        start = self.clock()
+        expanded = 0
+        while frontier:
+            _, negative_distance, x, y = frontier[0]
+            if x == food_x and y == food_y:
+                search.complete = True
+                break
+            if expanded % CLOCK_CHECK_INTERVAL == 0 and self.__out_of_time(start, expanded, deadline):
+                break
+            heappop(frontier)
+            expanded += 1
+            cell = y * col_count + x
+            if distances[cell] < -negative_distance:
+                # Superseded by a shorter path pushed later
+                continue
+            distance = 1 - negative_distance
+            for x_delta, y_delta in MOVES.values():
+                neighbour_x, neighbour_y = x + x_delta, y + y_delta
+                neighbour = neighbour_y * col_count + neighbour_x
+                if distance < distances.get(neighbour, distance + 1) and self.__is_free(neighbour_x, neighbour_y):
+                    distances[neighbour] = distance
+                    parents[neighbour] = cell
+                    heappush(frontier, (distance + abs(neighbour_x - food_x) + abs(neighbour_y - food_y),
+                                        -distance, neighbour_x, neighbour_y))
+
+        if not frontier:
+            return list()
+
+        # Searches are rooted where the head was when they started, the
+        # path starts where it is now
+        head = self.engine.snake.y * col_count + self.engine.snake.x
+        _, _, x, y = frontier[0]
+        cell = y * col_count + x
+        path = list()
+        while cell != head:
+            if cell == -1:
+                return list()
+            path.append((cell % col_count, cell // col_count))
+            cell = parents[cell]
+        path.reverse()
+        return path
+
+    def __tail_reachable_after(self, path: List[Position], deadline: Optional[float]) -> Optional[bool]:
+        """Whether the tail can be reached from the food once path is walked.
+
+        Returns None when the search runs out of time.
+        """
+        length = self.engine.snake.length + 1
+        body = [*reversed(path), *islice(((tile.x, tile.y) for tile in self.engine.snake.segments),
+                                         max(0, length - len(path)))][:length]
+        tail = body.pop()
+        blocked: Set[Position] = set(body)
+        food = path[-1]
+
+        seen = {food}
+        frontier = deque([food])
+        start = self.clock()
+        expanded = 0
+        while frontier:
+            x, y = frontier.popleft()
+            for x_delta, y_delta in MOVES.values():
+                neighbour = (x + x_delta, y + y_delta)
+                if neighbour == tail:
+                    return True
+                if (neighbour not in seen and neighbour not in blocked
+                        and 0 <= neighbour[0] < self.engine.grid.col_count
+                        and 0 <= neighbour[1] < self.engine.grid.row_count):
+                    seen.add(neighbour)
+                    frontier.append(neighbour)
+
+            expanded += 1
+            if expanded % CLOCK_CHECK_INTERVAL == 0 and self.__out_of_time(start, expanded, deadline):
+                return None
+        return False
+
+    def __fallback(self, moves: Dict[Position, SnakeDirection], goal: Position) -> SnakeDirection:
+        """Cheap safe move: the most free neighbours, then closest to goal."""
+        self.stats.fallback_moves += 1
+
+        def score(position: Position) -> Tuple[int, int]:
+            x, y = position
+            room = sum(self.__is_free(x + x_delta, y + y_delta) for x_delta, y_delta in MOVES.values())
+            return room, -(abs(x - goal[0]) + abs(y - goal[1]))
+
+        return moves[max(moves, key=score)]
+
+    def __plan(self, deadline: Optional[float]) -> Optional[SnakeDirection]:
+        moves = self.__safe_moves()
+        if not moves:
+            return None
+
+        food = (self.engine.food.x, self.engine.food.y)
+        if self.path and self.path_food == food and self.path[0] in moves:
+            return moves[self.path.popleft()]
+        self.path.clear()
+
+        # A search that ran out of time carries on from where it stopped
+        # while the snake walks toward its best cell
+        path = list()
+        if self.search is not None and self.search.food == food:
+            path = self.__extend(self.search, deadline)
+        if not path or path[0] not in moves:
+            self.search = self.__start_search(moves, food)
+            path = self.__extend(self.search, deadline)
+        if not path:
+            self.search = None
+            return self.__fallback(moves, food)
+        if not self.search.complete:
+            self.stats.partial_moves += 1
+            return moves[path[0]]
+        self.search = None
+
+        reachable = self.__tail_reachable_after(path, deadline)
+        if reachable is None:
+            self.stats.unverified_paths += 1
+        elif not reachable:
+            tail = self.engine.snake.segments[-1]
+            return self.__fallback(moves, (tail.x, tail.y))
+
+        self.path.extend(path)
+        self.path_food = food
+        return moves[self.path.popleft()]
+
+    def next_direction(self, time_budget: Optional[float] = None) -> Optional[SnakeDirection]:
+        """Direction for the next tick, None when no move is safe.
+
+        Without a time budget searches always run to completion, which
+        keeps the moves deterministic.
+        """
+        start = self.clock()
+        deadline = start + time_budget * (1 - PATH_TIME_FRACTION) if time_budget is not None else None
+        direction = self.__plan(deadline)
+        self.stats.record_tick(self.clock() - start, time_budget)
+        return direction
@@ -0,0 +1,38 @@
+import importlib
+from typing import Dict, Generic, List, Type, TypeVar
+
+T = TypeVar("T")
+
+
+class BackendRegistry(Generic[T]):
+    """Named backend classes, imported the first time they're requested.
+
+    Backends are registered as "module:attribute" strings, so registering
+    one costs nothing and a missing optional dependency only fails when
+    that backend is used. Plugins can register classes directly too.
+    """
+
+    def __init__(self, kind: str, backends: Dict[str, str]) -> None:
+        self.kind = kind
+        self.__backends: Dict[str, object] = dict(backends)
+
+    def register(self, name: str, backend):
+        """Registers a class, or a "module:attribute" string to import it."""
+        self.__backends[name] = backend
+
+    def names(self) -> List[str]:
+        return list(self.__backends)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.__backends
+
+    def get(self, name: str) -> Type[T]:
+        try:
+            backend = self.__backends[name]
+        except KeyError:
+            raise KeyError(f"unknown {self.kind} {name!r}, expected one of {self.names()}") from None
+        if isinstance(backend, str):
+            module_name, _, attribute = backend.partition(":")
+            backend = getattr(importlib.import_module(module_name), attribute)
+            self.__backends[name] = backend
+        return backend
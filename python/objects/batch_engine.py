@@ -0,0 +1,155 @@
+from dataclasses import dataclass
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .snake import SnakeDirection
+
+# Action codes understood by BatchEngine.step. An action is the index of a
+# direction in DIRECTIONS, or KEEP_DIRECTION to leave the direction as is.
+DIRECTIONS = (SnakeDirection.UP, SnakeDirection.DOWN,
+              SnakeDirection.LEFT, SnakeDirection.RIGHT, SnakeDirection.STOPPED)
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+KEEP_DIRECTION = -1
+
+STOPPED = DIRECTION_CODES[SnakeDirection.STOPPED]
+X_DELTAS = np.array([0, 0, -1, 1, 0])
+Y_DELTAS = np.array([-1, 1, 0, 0, 0])
+FORBIDDEN_MOVES = np.array([
+    DIRECTION_CODES[SnakeDirection.DOWN],
+    DIRECTION_CODES[SnakeDirection.UP],
+    DIRECTION_CODES[SnakeDirection.RIGHT],
+    DIRECTION_CODES[SnakeDirection.LEFT],
+    STOPPED,
+])
+
+
+class BatchStep(NamedTuple):
+    ate_food: np.ndarray
+    game_over: np.ndarray
+    # Length of the snake for the games that just ended, 0 elsewhere
+    final_length: np.ndarray
+
+
+@dataclass
+class BatchEngine:
+    """Many independent games stepped in lockstep with NumPy.
+
+    The rules are those of GameEngine.step, applied to every game at once.
+    Cells are addressed by their flat index y * col_count + x. Each game
+    stores its body as a ring buffer of cell indices going from tail to
+    head, next to a boolean occupancy grid.
+    """
+    batch_size: int
+    row_count: int
+    col_count: int
+    seed: Optional[int] = None
+    auto_reset: bool = True
+
+    def __post_init__(self):
+        self.rng = np.random.default_rng(self.seed)
+        self.cell_count = self.row_count * self.col_count
+        self.initial_cell = (self.row_count // 2) * self.col_count + self.col_count // 2
+
+        self.occupancy = np.zeros((self.batch_size, self.cell_count), dtype=bool)
+        self.body = np.zeros((self.batch_size, self.cell_count), dtype=np.int64)
+        self.head = np.zeros(self.batch_size, dtype=np.int64)
+        self.tail = np.zeros(self.batch_size, dtype=np.int64)
+        self.length = np.ones(self.batch_size, dtype=np.int64)
+        self.direction = np.full(self.batch_size, STOPPED, dtype=np.int64)
+        self.food = np.zeros(self.batch_size, dtype=np.int64)
+        self.tick_count = np.zeros(self.batch_size, dtype=np.int64)
+        self.done = np.zeros(self.batch_size, dtype=bool)
+
+        self.reset()
+
+    @property
+    def grids(self) -> np.ndarray:
+        return self.occupancy.reshape(self.batch_size, self.row_count, self.col_count)
+
+    def __spawn_food(self, games: np.ndarray) -> np.ndarray:
+        # Uniform pick among the free cells: random scores, occupied cells
+        # excluded, highest score wins
+        scores = self.rng.random((len(games), self.cell_count))
+        scores[self.occupancy[games]] = -1
+        return scores.argmax(axis=1)
+
+    def reset(self, games: Optional[np.ndarray] = None):
+        if games is None:
+            games = np.arange(self.batch_size)
+        self.occupancy[games] = False
+        self.occupancy[games, self.initial_cell] = True
+        self.body[games, 0] = self.initial_cell
+        self.head[games] = 0
+        self.tail[games] = 0
+        self.length[games] = 1
+        self.direction[games] = STOPPED
+        self.tick_count[games] = 0
+        self.done[games] = False
+        self.food[games] = self.__spawn_food(games)
+
+    def step(self, actions: np.ndarray) -> BatchStep:
+        actions = np.asarray(actions)
+        ate_food = np.zeros(self.batch_size, dtype=bool)
+        game_over = np.zeros(self.batch_size, dtype=bool)
+        final_length = np.zeros(self.batch_size, dtype=np.int64)
+
+        turning = (actions != KEEP_DIRECTION) & (FORBIDDEN_MOVES[self.direction] != actions)
+        self.direction = np.where(turning & ~self.done, actions, self.direction)
+        self.tick_count[~self.done] += 1
+
+        games = np.flatnonzero((self.direction != STOPPED) & ~self.done)
+        direction = self.direction[games]
+        head_cell = self.body[games, self.head[games]]
+        x = head_cell % self.col_count + X_DELTAS[direction]
+        y = head_cell // self.col_count + Y_DELTAS[direction]
+
+        inside = (x >= 0) & (x < self.col_count) & (y >= 0) & (y < self.row_count)
+        new_cell = np.where(inside, y * self.col_count + x, 0)
+        # The tail is still in place when the head moves, so running into it
+        # is a bite, as in Snake.update
+        bite = inside & self.occupancy[games, new_cell]
+        dead = ~inside | bite
+        game_over[games[dead]] = True
+
+        moving = ~dead
+        games, new_cell = games[moving], new_cell[moving]
+        eating = new_cell == self.food[games]
+
+        self.head[games] = (self.head[games] + 1) % self.cell_count
+        self.body[games, self.head[games]] = new_cell
+        self.occupancy[games, new_cell] = True
+
+        shrinking = games[~eating]
+        self.occupancy[shrinking, self.body[shrinking, self.tail[shrinking]]] = False
+        self.tail[shrinking] = (self.tail[shrinking] + 1) % self.cell_count
+
+        eaten = games[eating]
+        self.length[eaten] += 1
+        ate_food[eaten] = True
+        full = self.length[eaten] == self.cell_count
+        game_over[eaten[full]] = True
+        respawn = eaten[~full]
+        if len(respawn):
+            self.food[respawn] = self.__spawn_food(respawn)
+
+        ended = np.flatnonzero(game_over)
+        final_length[ended] = self.length[ended]
+        self.done[ended] = True
+        if self.auto_reset and len(ended):
+            self.reset(ended)
+
+        return BatchStep(ate_food=ate_food, game_over=game_over, final_length=final_length)
+
+    def body_positions(self, game: int) -> List[Tuple[int, int]]:
+        """Body of one game as (x, y) positions, head first like Snake.segments."""
+        slots = (self.head[game] - np.arange(self.length[game])) % self.cell_count
+        return [(int(cell % self.col_count), int(cell // self.col_count))
+                for cell in self.body[game, slots]]
+
+    def food_position(self, game: int) -> Tuple[int, int]:
+        cell = self.food[game]
+        return int(cell % self.col_count), int(cell // self.col_count)
+
+    def set_food(self, game: int, x: int, y: int):
+        self.food[game] = y * self.col_count + x
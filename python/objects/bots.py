@@ -0,0 +1,71 @@
+from random import Random
+from typing import Callable, Dict, List, Optional
+
+from .autopilot import Autopilot
+from .engine import GameEngine
+from .snake import SnakeDirection
+
+# A strategy picks the next direction from the engine state, or None to keep
+# going straight. The Random is seeded per game so bots stay deterministic.
+Strategy = Callable[[GameEngine, Random], Optional[SnakeDirection]]
+
+MOVES = {
+    SnakeDirection.UP: (0, -1),
+    SnakeDirection.DOWN: (0, 1),
+    SnakeDirection.LEFT: (-1, 0),
+    SnakeDirection.RIGHT: (1, 0),
+}
+
+
+def safe_directions(engine: GameEngine) -> List[SnakeDirection]:
+    snake = engine.snake
+    directions = list()
+    for direction, (x_delta, y_delta) in MOVES.items():
+        if snake.forbiden_moves[snake.direction] == direction:
+            continue
+        x, y = snake.x + x_delta, snake.y + y_delta
+        if not (0 <= x < engine.grid.col_count and 0 <= y < engine.grid.row_count):
+            continue
+        if snake.occupies(x, y):
+            continue
+        directions.append(direction)
+    return directions
+
+
+def random_bot(engine: GameEngine, rng: Random) -> Optional[SnakeDirection]:
+    directions = safe_directions(engine)
+    if not directions:
+        return None
+    return rng.choice(directions)
+
+
+def greedy_bot(engine: GameEngine, rng: Random) -> Optional[SnakeDirection]:
+    directions = safe_directions(engine)
+    if not directions:
+        return None
+
+    def distance_to_food(direction: SnakeDirection) -> int:
+        x_delta, y_delta = MOVES[direction]
+        return (abs(engine.snake.x + x_delta - engine.food.x)
+                + abs(engine.snake.y + y_delta - engine.food.y))
+
+    return min(directions, key=distance_to_food)
+
+
+class AutopilotBot:
+    """Autopilot strategy, planned without a time budget to stay deterministic."""
+
+    def __init__(self) -> None:
+        self.autopilot: Optional[Autopilot] = None
+
+    def __call__(self, engine: GameEngine, rng: Random) -> Optional[SnakeDirection]:
+        if self.autopilot is None or self.autopilot.engine is not engine:
+            self.autopilot = Autopilot(engine)
+        return self.autopilot.next_direction()
+
+
+STRATEGIES: Dict[str, Strategy] = {
+    "random": random_bot,
+    "greedy": greedy_bot,
+    "autopilot": AutopilotBot(),
+}
@@ -0,0 +1,137 @@
+import random
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Dict, Iterator, Tuple
+
+from .free_cells import MAX_REJECTIONS
+from .grid import Grid
+from .tiles import CellKind, Tile
+
+Position = Tuple[int, int]
+
+# Chunks are CHUNK_SIZE x CHUNK_SIZE cells, a power of two so that chunk
+# coordinates are shifts and masks. Small chunks keep scattered tiles, like
+# food, from holding much memory each.
+CHUNK_SHIFT = 4
+CHUNK_SIZE = 1 << CHUNK_SHIFT
+CHUNK_MASK = CHUNK_SIZE - 1
+
+
+class Chunk:
+    __slots__ = ("cells", "occupied")
+
+    def __init__(self) -> None:
+        # One CellKind byte per cell, in row-major order
+        self.cells = bytearray(CHUNK_SIZE * CHUNK_SIZE)
+        self.occupied = 0
+
+
+class ChunkedFreeCells:
+    """Free cells of a ChunkedGrid, read from its chunks rather than stored.
+
+    Random choices draw a cell over the whole grid until a free one comes
+    up, which takes a couple of draws unless the grid is nearly full. The
+    draws are those of FreeCells, a chunked grid spawns the same food as a
+    flat one.
+    """
+
+    def __init__(self, grid: "ChunkedGrid") -> None:
+        self.grid = grid
+
+    def __len__(self) -> int:
+        return self.grid.row_count * self.grid.col_count - self.grid.occupied_count
+
+    def __contains__(self, position: Position) -> bool:
+        x, y = position
+        return (0 <= x < self.grid.col_count and 0 <= y < self.grid.row_count
+                and self.grid.kind_at(x, y) == CellKind.EMPTY)
+
+    def __iter__(self) -> Iterator[Position]:
+        return ((x, y) for x in range(self.grid.col_count) for y in range(self.grid.row_count)
+                if self.grid.kind_at(x, y) == CellKind.EMPTY)
+
+    def random_choice(self, randrange: Callable[[int], int] = random.randrange) -> Position:
+        row_count = self.grid.row_count
+        cell_count = self.grid.col_count * row_count
+        for _ in range(MAX_REJECTIONS):
+            x, y = divmod(randrange(cell_count), row_count)
+            if self.grid.kind_at(x, y) == CellKind.EMPTY:
+                return x, y
+        return next(islice(iter(self), randrange(len(self)), None))
+
+
+@dataclass
+class ChunkedGrid(Grid):
+    """Grid storing only the chunks something occupies.
+
+    Memory and creation time depend on the occupied cells rather than on
+    the size of the grid, so very large maps start instantly. Chunks are
+    created on the first tile added to them and dropped once they're
+    empty again.
+    """
+
+    def __post_init__(self):
+        self.tile_width = self.renderer.window_width / self.col_count
+        self.tile_height = self.renderer.window_height / self.row_count
+        self.renderer.set_grid_size(self.col_count, self.row_count)
+        self.chunks: Dict[Tuple[int, int], Chunk] = dict()
+        self.occupied_count = 0
+        # Indexes of the cells changed since the last draw, y * col_count + x
+        self.updated_cells = list()
+        self.empty_positions = ChunkedFreeCells(self)
+
+    def kind_at(self, x: int, y: int) -> CellKind:
+        chunk = self.chunks.get((x >> CHUNK_SHIFT, y >> CHUNK_SHIFT))
+        if chunk is None:
+            return CellKind.EMPTY
+        return CellKind(chunk.cells[((y & CHUNK_MASK) << CHUNK_SHIFT) | (x & CHUNK_MASK)])
+
+    def cell_at(self, index: int) -> int:
+        y, x = divmod(index, self.col_count)
+        chunk = self.chunks.get((x >> CHUNK_SHIFT, y >> CHUNK_SHIFT))
+        if chunk is None:
+            return CellKind.EMPTY
+        return chunk.cells[((y & CHUNK_MASK) << CHUNK_SHIFT) | (x & CHUNK_MASK)]
+
+    def occupied_cells(self) -> Iterator[Tuple[int, int]]:
+        for (chunk_x, chunk_y), chunk in self.chunks.items():
+            for offset, kind in enumerate(chunk.cells):
+                if kind != CellKind.EMPTY:
+                    y = (chunk_y << CHUNK_SHIFT) | (offset >> CHUNK_SHIFT)
+                    x = (chunk_x << CHUNK_SHIFT) | (offset & CHUNK_MASK)
+                    yield y * self.col_count + x, kind
+
+    def __set(self, x: int, y: int, kind: CellKind):
+        key = (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if kind == CellKind.EMPTY:
+                return
+            chunk = self.chunks[key] = Chunk()
+        offset = ((y & CHUNK_MASK) << CHUNK_SHIFT) | (x & CHUNK_MASK)
+        was_empty = chunk.cells[offset] == CellKind.EMPTY
+        chunk.cells[offset] = kind
+        if was_empty and kind != CellKind.EMPTY:
+            chunk.occupied += 1
+            self.occupied_count += 1
+        elif not was_empty and kind == CellKind.EMPTY:
+            chunk.occupied -= 1
+            self.occupied_count -= 1
+            if not chunk.occupied:
+                del self.chunks[key]
+
+    def add_tile(self, tile: Tile):
+        self.__set(tile.x, tile.y, tile.kind)
+        if self.track_updates:
+            self.updated_cells.append(tile.y * self.col_count + tile.x)
+
+    def remove_tile(self, x: int, y: int):
+        self.__set(x, y, CellKind.EMPTY)
+        if self.track_updates:
+            self.updated_cells.append(y * self.col_count + x)
+
+    def clear(self):
+        if self.track_updates:
+            self.updated_cells.extend(index for index, _ in self.occupied_cells())
+        self.chunks.clear()
+        self.occupied_count = 0
@@ -0,0 +1,258 @@
+import logging
+import math
+import struct
+from array import array
+from dataclasses import dataclass
+from enum import Enum, auto
+from hashlib import blake2b
+from random import Random
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+from .chunked_grid import ChunkedGrid
+from .food import FoodFactory, FoodTile
+from .grid import Grid
+from .renderers.renderer import Renderer
+from .snake import Snake, SnakeDirection, SnakeEvent, SnakeUpdate
+
+log = logging.getLogger(__package__)
+
+
+class GameState(Enum):
+    GAME_INIT = auto()
+    GAME_RUNNING = auto()
+    GAME_PAUSED = auto()
+    GAME_STOPPED = auto()
+
+
+class GameEvent(Enum):
+    SPEED_UP = auto()
+    GAME_OVER = auto()
+    NO_EVENT = auto()
+
+
+class GameSnapshot(NamedTuple):
+    """Immutable copy of everything that drives a game forward."""
+    tick_count: int
+    game_state: GameState
+    direction: SnakeDirection
+    # Body coordinates, head first, flattened as x0, y0, x1, y1...
+    body: Tuple[int, ...]
+    food: Tuple[int, int]
+    speed_level: int
+    snake_speed: float
+    rng_state: Tuple[Any, ...]
+
+    def to_bytes(self) -> bytes:
+        rng_version, rng_internal_state, gauss_next = self.rng_state
+        header = SNAPSHOT_HEADER.pack(
+            self.tick_count, self.game_state.value, self.direction.value,
+            self.food[0], self.food[1], self.speed_level, self.snake_speed,
+            rng_version, gauss_next is not None, gauss_next or 0.0,
+            len(rng_internal_state), len(self.body))
+        return (header + array("I", rng_internal_state).tobytes()
+                + array("i", self.body).tobytes())
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "GameSnapshot":
+        (tick_count, game_state, direction, food_x, food_y, speed_level, snake_speed,
+         rng_version, has_gauss_next, gauss_next, rng_state_size,
+         body_size) = SNAPSHOT_HEADER.unpack_from(data)
+        offset = SNAPSHOT_HEADER.size
+        rng_internal_state = array("I")
+        rng_internal_state.frombytes(data[offset:offset + rng_state_size * rng_internal_state.itemsize])
+        offset += rng_state_size * rng_internal_state.itemsize
+        body = array("i")
+        body.frombytes(data[offset:offset + body_size * body.itemsize])
+        return GameSnapshot(
+            tick_count=tick_count, game_state=GameState(game_state),
+            direction=SnakeDirection(direction), body=tuple(body),
+            food=(food_x, food_y), speed_level=speed_level, snake_speed=snake_speed,
+            rng_state=(rng_version, tuple(rng_internal_state),
+                       gauss_next if has_gauss_next else None))
+
+
+# tick count, game state, direction, food x, food y, speed level, snake speed,
+# rng version, has gauss_next, gauss_next, rng state size, body size
+SNAPSHOT_HEADER = struct.Struct("<qBBiiIdB?dII")
+
+
+@dataclass
+class GameEngine:
+    """Clock-free game rules.
+
+    The engine advances one tick per call to step() and never touches a
+    clock, an input backend or the process lifetime, so it can be driven
+    by the real-time game as well as by bots and tests.
+    """
+    grid: Grid
+    snake: Snake
+    food_factory: FoodFactory
+    snake_speed: float = 1  # in moves/sec
+    snake_acceleration_factor: float = 0.7
+    # Seeds the food factory when set, which makes the game reproducible
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        self.initial_snake_speed = self.snake_speed
+        if self.grid.wrap:
+            self.snake.wrap_size = (self.grid.col_count, self.grid.row_count)
+        if self.seed is not None:
+            self.food_factory.seed(self.seed)
+        # Direction changes as (tick, direction), only kept once
+        # start_recording() has been called
+        self.direction_changes: Optional[List[Tuple[int, SnakeDirection]]] = None
+        self.__start()
+
+    @staticmethod
+    def headless(row_count: int, col_count: int,
+                 seed: Optional[int] = None,
+                 snake_speed: float = 1,
+                 chunked: bool = False,
+                 wrap: bool = False) -> "GameEngine":
+        renderer = Renderer(window_width=col_count, window_height=row_count)
+        # Chunked grids only take memory for the occupied cells, for maps
+        # too large to hold a byte per cell
+        grid_type = ChunkedGrid if chunked else Grid
+        grid = grid_type(row_count=row_count, col_count=col_count,
+                         renderer=renderer, track_updates=False, wrap=wrap)
+        snake = Snake(initial_x=col_count // 2, initial_y=row_count // 2)
+        return GameEngine(grid=grid, snake=snake,
+                          food_factory=FoodFactory(rng=Random(seed)),
+                          snake_speed=snake_speed, seed=seed)
+
+    def __start(self):
+        self.game_state = GameState.GAME_RUNNING
+        self.speed_level = 0
+        self.tick_count = 0
+        self.__recorded_direction = self.snake.direction
+        self.__last_move = SnakeUpdate()
+        if self.direction_changes is not None:
+            self.direction_changes.clear()
+
+        for tile in self.snake.segments:
+            self.grid.add_tile(tile=tile)
+
+        self.food = self.food_factory.spawn_food(self.grid.empty_positions)
+        self.grid.add_tile(self.food)
+
+    def reset(self, seed: Optional[int] = None) -> GameState:
+        # Without a new seed the food factory carries on with its current
+        # random state, which can't be replayed
+        self.seed = seed
+        if seed is not None:
+            self.food_factory.seed(seed)
+        self.grid.clear()
+        self.snake.reset()
+        self.snake_speed = self.initial_snake_speed
+        self.__start()
+        return self.game_state
+
+    def __speed_up(self):
+        self.speed_level += 1
+        self.snake_speed += self.snake_acceleration_factor * math.log10(1 + self.speed_level)
+
+    def __update(self) -> GameEvent:
+        snake_update: SnakeUpdate = self.snake.update(
+            food_x=self.food.x, food_y=self.food.y)
+        self.__last_move = snake_update
+
+        if snake_update.event == SnakeEvent.SELF_BITE:
+            return GameEvent.GAME_OVER
+
+        if self.snake.x >= self.grid.col_count or self.snake.x < 0:
+            return GameEvent.GAME_OVER
+
+        if self.snake.y >= self.grid.row_count or self.snake.y < 0:
+            return GameEvent.GAME_OVER
+
+        self.grid.apply_delta(snake_update)
+
+        if snake_update.event == SnakeEvent.ATE_FOOD:
+            if not self.grid.empty_positions:
+                log.info("The snake fills the whole grid")
+                return GameEvent.GAME_OVER
+            self.food = self.food_factory.spawn_food(self.grid.empty_positions)
+            self.grid.add_tile(self.food)
+            log.info("Spawning new food at: (%d, %d)", self.food.x, self.food.y)
+            return GameEvent.SPEED_UP
+
+        return GameEvent.NO_EVENT
+
+    def step(self, action: Optional[SnakeDirection] = None) -> Tuple[GameState, GameEvent]:
+        if self.game_state == GameState.GAME_STOPPED:
+            return self.game_state, GameEvent.GAME_OVER
+
+        if action is not None:
+            self.snake.direction = action
+
+        if self.direction_changes is not None and self.snake.direction != self.__recorded_direction:
+            self.__recorded_direction = self.snake.direction
+            self.direction_changes.append((self.tick_count, self.snake.direction))
+
+        game_event = self.__update()
+        self.tick_count += 1
+
+        if game_event == GameEvent.GAME_OVER:
+            self.game_state = GameState.GAME_STOPPED
+        elif game_event == GameEvent.SPEED_UP:
+            self.__speed_up()
+
+        return self.game_state, game_event
+
+    def start_recording(self):
+        self.direction_changes = list()
+        self.__recorded_direction = self.snake.direction
+
+    def state_hash(self) -> bytes:
+        state = blake2b(digest_size=16)
+        state.update(array("q", [
+            self.tick_count, self.game_state.value, self.snake.direction.value,
+            self.food.x, self.food.y, self.snake.length]).tobytes())
+        state.update(array("q", [coord for tile in self.snake.segments
+                                 for coord in (tile.x, tile.y)]).tobytes())
+        return state.digest()
+
+    def snapshot(self) -> GameSnapshot:
+        return GameSnapshot(
+            tick_count=self.tick_count, game_state=self.game_state,
+            direction=self.snake.direction,
+            body=tuple(coord for tile in self.snake.segments for coord in (tile.x, tile.y)),
+            food=(self.food.x, self.food.y), speed_level=self.speed_level,
+            snake_speed=self.snake_speed, rng_state=self.food_factory.rng.getstate())
+
+    def __on_grid(self, x: int, y: int) -> bool:
+        return 0 <= x < self.grid.col_count and 0 <= y < self.grid.row_count
+
+    def restore(self, snapshot: GameSnapshot):
+        """Bring the game back to snapshot, in O(snake length).
+
+        Food is picked from the free cells whatever their order, so the same
+        actions lead to the same food and states as after the snapshot was
+        taken.
+        """
+        # The fatal move of a stopped game isn't applied to the grid, which
+        # still holds the tail it removed, and the head may be off the grid
+        stale = [(tile.x, tile.y) for tile in self.snake.segments]
+        if self.game_state == GameState.GAME_STOPPED:
+            stale += self.__last_move.removed
+        stale.append((self.food.x, self.food.y))
+        for x, y in stale:
+            if self.__on_grid(x, y):
+                self.grid.remove_tile(x=x, y=y)
+
+        body = snapshot.body
+        self.snake.restore(zip(body[0::2], body[1::2]), snapshot.direction)
+        for tile in self.snake.segments:
+            if self.__on_grid(tile.x, tile.y):
+                self.grid.add_tile(tile=tile)
+        self.food = FoodTile(x=snapshot.food[0], y=snapshot.food[1])
+        self.grid.add_tile(self.food)
+        self.__last_move = SnakeUpdate()
+
+        self.tick_count = snapshot.tick_count
+        self.game_state = snapshot.game_state
+        self.speed_level = snapshot.speed_level
+        self.snake_speed = snapshot.snake_speed
+        self.food_factory.rng.setstate(snapshot.rng_state)
+        # Recording can't follow a jump in time
+        self.direction_changes = None
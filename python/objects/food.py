@@ -1,19 +1,22 @@
-from dataclasses import dataclass
-from random import randrange
-from typing import List, Tuple
+from dataclasses import dataclass, field
+from random import Random
 
-from .renderers.renderer import Colors, Shapes
-from .tiles import Tile
+from .free_cells import FreeCells
+from .tiles import CellKind, Tile
 
 
-@dataclass
+@dataclass(slots=True)
 class FoodTile(Tile):
-    shape: Shapes = Shapes.CIRCLE
-    color: Colors = Colors.RED
+    kind: CellKind = CellKind.FOOD
 
 
 @dataclass
 class FoodFactory:
-    def spawn_food(self, available_spots: List[Tuple[int, int]]) -> Tile:
-        x, y = available_spots[randrange(len(available_spots))]
+    rng: Random = field(default_factory=Random)
+
+    def seed(self, seed: int):
+        self.rng.seed(seed)
+
+    def spawn_food(self, available_spots: FreeCells) -> Tile:
+        x, y = available_spots.random_choice(self.rng.randrange)
         return FoodTile(x=x, y=y)
@@ -0,0 +1,118 @@
+import random
+from array import array
+from typing import Callable, Dict, Iterator, Tuple, Union
+
+Position = Tuple[int, int]
+
+# Overrides stored in dicts beyond which plain arrays take less memory
+DENSE_FRACTION = 8
+# Random draws that may hit occupied cells before falling back to picking
+# among the free cells one by one
+MAX_REJECTIONS = 64
+
+
+class FreeCells:
+    """Set of free grid positions supporting O(1) add, remove and
+    membership, and uniform random sampling in O(1) on average until the
+    grid is nearly full.
+
+    Positions are kept in a dense array, and a position-to-slot map allows
+    removing any position by swapping it with the last one. The array starts
+    out holding every position of the grid in column-major order and only the
+    slots that differ from that layout are stored, so creating a full set is
+    O(1) whatever the grid size. Once enough slots differ, the maps switch to
+    flat arrays of 4 bytes per cell.
+    """
+
+    def __init__(self, col_count: int, row_count: int) -> None:
+        self.col_count = col_count
+        self.row_count = row_count
+        self.__length = col_count * row_count
+        # Positions are coded as their slot in the initial layout
+        self.__slot_codes: Union[Dict[int, int], array] = dict()
+        self.__code_slots: Union[Dict[int, int], array] = dict()
+        self.__dense = False
+
+    def __densify(self):
+        cell_count = self.col_count * self.row_count
+        slot_codes = array("i", range(cell_count))
+        code_slots = array("i", slot_codes)
+        for slot, code in self.__slot_codes.items():
+            slot_codes[slot] = code
+        for code, slot in self.__code_slots.items():
+            code_slots[code] = slot
+        self.__slot_codes = slot_codes
+        self.__code_slots = code_slots
+        self.__dense = True
+
+    def __code_at(self, slot: int) -> int:
+        if self.__dense:
+            return self.__slot_codes[slot]
+        return self.__slot_codes.get(slot, slot)
+
+    def __slot_of(self, code: int) -> int:
+        if self.__dense:
+            return self.__code_slots[code]
+        return self.__code_slots.get(code, code)
+
+    def __code(self, position: Position) -> int:
+        x, y = position
+        if not (0 <= x < self.col_count and 0 <= y < self.row_count):
+            return -1
+        return x * self.row_count + y
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def __contains__(self, position: Position) -> bool:
+        code = self.__code(position)
+        if code < 0:
+            return False
+        slot = self.__slot_of(code)
+        return slot < self.__length and self.__code_at(slot) == code
+
+    def __iter__(self) -> Iterator[Position]:
+        return (divmod(self.__code_at(slot), self.row_count) for slot in range(self.__length))
+
+    def add(self, position: Position):
+        if position in self:
+            return
+        code = self.__code(position)
+        self.__slot_codes[self.__length] = code
+        self.__code_slots[code] = self.__length
+        self.__length += 1
+        if not self.__dense and len(self.__slot_codes) > self.col_count * self.row_count // DENSE_FRACTION:
+            self.__densify()
+
+    def remove(self, position: Position):
+        if position not in self:
+            raise KeyError(position)
+        code = self.__code(position)
+        slot = self.__slot_of(code)
+        self.__length -= 1
+        if slot != self.__length:
+            last = self.__code_at(self.__length)
+            self.__slot_codes[slot] = last
+            self.__code_slots[last] = slot
+        if not self.__dense:
+            self.__slot_codes.pop(self.__length, None)
+            self.__code_slots.pop(code, None)
+
+    def discard(self, position: Position):
+        if position in self:
+            self.remove(position)
+
+    def random_choice(self, randrange: Callable[[int], int] = random.randrange) -> Position:
+        """Uniform choice depending only on which cells are free, not on
+        their order in the array, so games restored from a snapshot spawn
+        the same food. Draws over the whole grid until a free cell comes up,
+        then picks among the free cells in column-major order once the grid
+        is so full that draws keep missing."""
+        cell_count = self.col_count * self.row_count
+        for _ in range(MAX_REJECTIONS):
+            code = randrange(cell_count)
+            slot = self.__slot_of(code)
+            if slot < self.__length and self.__code_at(slot) == code:
+                return divmod(code, self.row_count)
+        free = sorted(self.__code_at(slot) for slot in range(self.__length))
+        return divmod(free[randrange(len(free))], self.row_count)
@@ -1,12 +1,16 @@
 import logging
+import re
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Iterator, List, Tuple
 
+from .free_cells import FreeCells
 from .renderers.renderer import Renderer
-from .tiles import Tile
+from .tiles import TILE_STYLES, CellKind, Tile, TileDelta
 
 log = logging.getLogger(__package__)
 
+NON_EMPTY_CELL = re.compile(rb"[^\x00]")
+
 
 @dataclass
 class Grid:
@@ -15,37 +19,83 @@ class Grid:
 
     renderer: Renderer
 
+    # Headless grids are never drawn, so they don't need to remember which
+    # tiles changed
+    track_updates: bool = True
+    # Snakes leaving the grid come back on the opposite side
+    wrap: bool = False
+
     def __post_init__(self):
         self.tile_width = self.renderer.window_width / self.col_count
         self.tile_height = self.renderer.window_height / self.row_count
-        self.tiles: Dict[Tuple[int, int], Tile] = dict()
-        self.updated_tiles: List[Tile] = list()
-        self.empty_positions: List[Tuple[int, int]] = [
-            (x, y) for x in range(self.row_count) for y in range(self.col_count)]
+        self.renderer.set_grid_size(self.col_count, self.row_count)
+        # What each cell holds, one CellKind byte per cell in row-major
+        # order. Tiles are never stored, their look is shared per kind
+        self.cells = bytearray(self.row_count * self.col_count)
+        # Indexes of the cells changed since the last draw
+        self.updated_cells: List[int] = list()
+        self.empty_positions = FreeCells(self.col_count, self.row_count)
+
+    def kind_at(self, x: int, y: int) -> CellKind:
+        return CellKind(self.cells[y * self.col_count + x])
+
+    def cell_at(self, index: int) -> int:
+        """CellKind code of the cell at index, y * col_count + x."""
+        return self.cells[index]
+
+    def occupied_cells(self) -> Iterator[Tuple[int, int]]:
+        """(index, CellKind code) of every cell that isn't empty."""
+        return ((match.start(), self.cells[match.start()])
+                for match in NON_EMPTY_CELL.finditer(self.cells))
 
     def add_tile(self, tile: Tile):
-        self.tiles[(tile.x, tile.y)] = tile
-        if (tile.x, tile.y) in self.empty_positions:
-            self.empty_positions.remove((tile.x, tile.y))
-        self.updated_tiles.append(tile)
+        index = tile.y * self.col_count + tile.x
+        self.cells[index] = tile.kind
+        self.empty_positions.discard((tile.x, tile.y))
+        if self.track_updates:
+            self.updated_cells.append(index)
 
     def remove_tile(self, x: int, y: int):
-        empty_tile = Tile(x=x, y=y)
-        self.tiles[(x, y)] = empty_tile
-        self.empty_positions.append((x, y))
-        self.updated_tiles.append(empty_tile)
+        index = y * self.col_count + x
+        self.cells[index] = CellKind.EMPTY
+        self.empty_positions.add((x, y))
+        if self.track_updates:
+            self.updated_cells.append(index)
+
+    def clear(self):
+        # A new free cell index is created in O(1), emptying the current
+        # one would take a call per occupied cell
+        if self.track_updates:
+            self.updated_cells.extend(match.start() for match in NON_EMPTY_CELL.finditer(self.cells))
+        self.cells = bytearray(self.row_count * self.col_count)
+        self.empty_positions = FreeCells(self.col_count, self.row_count)
+
+    def apply_delta(self, delta: TileDelta):
+        for x, y in delta.removed:
+            self.remove_tile(x=x, y=y)
+        for tile in delta.added:
+            self.add_tile(tile=tile)
 
     def __convert_coord_to_pixel(self, x: int, y: int) -> Tuple[int, int]:
         pixel_x = x * self.tile_width
         pixel_y = y * self.tile_height
         return int(pixel_x), int(pixel_y)
 
+    def __add_updated_tiles_to_frame(self):
+        log.debug("Drawing %d updated tiles", len(self.updated_cells))
+        for index in self.updated_cells:
+            # Cells are drawn as they are now, however often they changed
+            style = TILE_STYLES[self.cell_at(index)]
+            y, x = divmod(index, self.col_count)
+            x, y = self.__convert_coord_to_pixel(x=x, y=y)
+            self.renderer.add_shape_to_frame(
+                x=x, y=y, shape_width=int(self.tile_width), shape_height=int(self.tile_height), shape=style.shape, shape_color=style.color)
+        self.updated_cells.clear()
+
     def draw(self):
-        for tile in self.updated_tiles:
-            if tile.shape:
-                log.debug(f"updating following tile: {self.updated_tiles}")
-                x, y = self.__convert_coord_to_pixel(x=tile.x, y=tile.y)
-                self.renderer.add_shape_to_frame(
-                    x=x, y=y, shape_width=int(self.tile_width), shape_height=int(self.tile_height), shape=tile.shape, shape_color=tile.color)
-        self.updated_tiles.clear()
+        self.__add_updated_tiles_to_frame()
         self.renderer.draw_frame()
+
+    async def draw_async(self):
+        self.__add_updated_tiles_to_frame()
+        await self.renderer.draw_frame_async()
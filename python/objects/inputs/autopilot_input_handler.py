@@ -0,0 +1,53 @@
+import logging
+from typing import List, Optional
+
+from ..autopilot import Autopilot
+from ..engine import GameEngine
+from .input_handler import InputHandler
+from .inputs import INPUT_DIRECTIONS, Inputs
+
+log = logging.getLogger(__package__)
+
+DIRECTION_INPUTS = {direction: input for input, direction in INPUT_DIRECTIONS.items()
+                    if input in (Inputs.UP, Inputs.DOWN, Inputs.LEFT, Inputs.RIGHT)}
+
+
+class AutopilotInputHandler(InputHandler):
+    """Input handler that plays the game itself.
+
+    Plans once per tick with a time budget of budget_fraction of the
+    current tick period, so it keeps up as the snake speeds up. It reads
+    the engine while planning, so it must be pumped from the game loop
+    rather than an input thread.
+    """
+    reads_engine = True
+
+    def __init__(self, budget_fraction: float = 0.5) -> None:
+        self.budget_fraction = budget_fraction
+        self.autopilot: Optional[Autopilot] = None
+        self.planned_tick = -1
+
+    def attach(self, engine: GameEngine):
+        self.autopilot = Autopilot(engine)
+
+    @property
+    def stats(self):
+        return self.autopilot.stats
+
+    def get_latest_inputs(self) -> List[Inputs]:
+        engine = self.autopilot.engine
+        if engine.tick_count == self.planned_tick:
+            return list()
+        self.planned_tick = engine.tick_count
+
+        direction = self.autopilot.next_direction(self.budget_fraction / engine.snake_speed)
+        if direction is None or direction == engine.snake.direction:
+            return list()
+        return [DIRECTION_INPUTS[direction]]
+
+    def log_stats(self):
+        stats = self.stats
+        log.info("Autopilot planning: mean %.3f ms, max %.3f ms, %d/%d ticks over budget, "
+                 "%d searches, %d partial moves, %d fallback moves, %d unverified paths",
+                 stats.mean_time * 1000, stats.max_time * 1000, stats.over_budget, stats.ticks,
+                 stats.searches, stats.partial_moves, stats.fallback_moves, stats.unverified_paths)
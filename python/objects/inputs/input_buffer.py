@@ -0,0 +1,106 @@
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum, auto
+from threading import Event, Thread
+from time import monotonic
+from typing import Callable, Deque, List, NamedTuple, Optional
+
+from .inputs import Inputs
+
+
+class InputEvent(NamedTuple):
+    input: Inputs
+    timestamp: float
+
+
+class CoalescingPolicy(Enum):
+    # Oldest pending input applied each tick, the others wait for the next ones
+    ONE_PER_TICK = auto()
+    # Only the most recent input since the last tick
+    LATEST = auto()
+    # Every input since the last tick, in order
+    ALL = auto()
+
+
+@dataclass
+class InputLatencyStats:
+    count: int = 0
+    total_latency: float = 0
+    max_latency: float = 0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.count if self.count else 0
+
+    def record(self, latency: float):
+        self.count += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+
+class InputBuffer:
+    """Timestamped inputs waiting for the next game tick.
+
+    deque appends and pops are atomic, so handlers may push from their own
+    thread without taking a lock. When full, the oldest input is dropped.
+    """
+
+    def __init__(self, maxlen: int = 8, clock: Callable[[], float] = monotonic) -> None:
+        self.clock = clock
+        self.dropped = 0
+        self.__events: Deque[InputEvent] = deque(maxlen=maxlen)
+
+    def __len__(self) -> int:
+        return len(self.__events)
+
+    def push(self, input: Inputs, timestamp: Optional[float] = None):
+        if len(self.__events) == self.__events.maxlen:
+            self.dropped += 1
+        if timestamp is None:
+            timestamp = self.clock()
+        self.__events.append(InputEvent(input, timestamp))
+
+    def __pop_all(self) -> List[InputEvent]:
+        events: List[InputEvent] = list()
+        while True:
+            try:
+                events.append(self.__events.popleft())
+            except IndexError:
+                return events
+
+    def drain(self, policy: CoalescingPolicy = CoalescingPolicy.ONE_PER_TICK) -> List[InputEvent]:
+        if policy == CoalescingPolicy.ONE_PER_TICK:
+            try:
+                return [self.__events.popleft()]
+            except IndexError:
+                return []
+
+        events = self.__pop_all()
+        if policy == CoalescingPolicy.LATEST:
+            return events[-1:]
+        return events
+
+
+class InputThread(Thread):
+    """Pumps an input handler into a buffer from a background thread.
+
+    Only for handlers that may be polled outside of the main thread; SDL
+    based handlers such as PygameKeyboardHandler have to be pumped by the
+    game loop instead.
+    """
+
+    def __init__(self, input_handler, input_buffer: InputBuffer,
+                 poll_interval: float = 0.005) -> None:
+        super().__init__(name="InputThread", daemon=True)
+        self.input_handler = input_handler
+        self.input_buffer = input_buffer
+        self.poll_interval = poll_interval
+        self.stopped = Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.input_handler.wait_for_inputs(self.poll_interval)
+            self.input_handler.pump(self.input_buffer)
+
+    def stop(self):
+        self.stopped.set()
@@ -1,10 +1,43 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List
+from time import sleep
+from typing import TYPE_CHECKING, List
 
+from .input_buffer import InputBuffer
 from .inputs import Inputs
 
+if TYPE_CHECKING:
+    from ..engine import GameEngine
+
 
 class InputHandler(ABC):
+    # Handlers reading the engine must be pumped by the thread stepping it
+    reads_engine = False
+
+    def attach(self, engine: "GameEngine"):
+        """Called by the game once its engine exists."""
+
     @abstractmethod
     def get_latest_inputs(self) -> List[Inputs]:
         ...
+
+    def wait_for_inputs(self, timeout: float):
+        """Block until new inputs may be available or timeout seconds elapsed."""
+        sleep(timeout)
+
+    def log_stats(self):
+        """Called at game over, for handlers keeping stats of their own."""
+
+    async def get_latest_inputs_async(self) -> List[Inputs]:
+        return self.get_latest_inputs()
+
+    async def wait_for_inputs_async(self, timeout: float):
+        await asyncio.sleep(timeout)
+
+    def pump(self, input_buffer: InputBuffer) -> List[Inputs]:
+        """Push the latest inputs, timestamped now, into input_buffer."""
+        inputs = self.get_latest_inputs()
+        timestamp = input_buffer.clock()
+        for input in inputs:
+            input_buffer.push(input, timestamp)
+        return inputs
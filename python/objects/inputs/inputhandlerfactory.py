@@ -0,0 +1,17 @@
+from ..backends import BackendRegistry
+from .input_handler import InputHandler
+
+# Imported when first used, like the renderers. Plugins add their own with
+# INPUT_HANDLERS.register().
+INPUT_HANDLERS: BackendRegistry[InputHandler] = BackendRegistry("input handler", {
+    "keyboard": f"{__package__}.pygame_keyboard_handler:PygameKeyboardHandler",
+    "autopilot": f"{__package__}.autopilot_input_handler:AutopilotInputHandler",
+    "queue": f"{__package__}.queue_input_handler:QueueInputHandler",
+    "scripted": f"{__package__}.scripted_input_handler:ScriptedInputHandler",
+})
+
+
+class InputHandlerFactory:
+    @staticmethod
+    def get_input_handler(name: str, **kwargs) -> InputHandler:
+        return INPUT_HANDLERS.get(name)(**kwargs)
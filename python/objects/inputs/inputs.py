@@ -1,5 +1,7 @@
 from enum import Enum, auto
 
+from ..snake import SnakeDirection
+
 
 class Inputs(Enum):
     UP = auto()
@@ -8,3 +10,13 @@ class Inputs(Enum):
     RIGHT = auto()
     PAUSE = auto()
     QUIT = auto()
+
+
+INPUT_DIRECTIONS = {
+    Inputs.UP: SnakeDirection.UP,
+    Inputs.RIGHT: SnakeDirection.RIGHT,
+    Inputs.LEFT: SnakeDirection.LEFT,
+    Inputs.DOWN: SnakeDirection.DOWN,
+    Inputs.PAUSE: SnakeDirection.STOPPED,
+    Inputs.QUIT: SnakeDirection.STOPPED
+}
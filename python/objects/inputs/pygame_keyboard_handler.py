@@ -1,4 +1,5 @@
 import logging
+import math
 import sys
 from typing import List
 
@@ -10,7 +11,8 @@ from .inputs import Inputs
 log = logging.getLogger(__package__)
 
 
-# TODO: Setup the callbacks and make this a Thread
+# SDL events can only be pumped from the thread owning the window, so this
+# handler is pumped by the game loop rather than from an InputThread
 class PygameKeyboardHandler(InputHandler):
     def __init__(self) -> None:
 
@@ -26,11 +28,16 @@ class PygameKeyboardHandler(InputHandler):
             pygame.K_ESCAPE: Inputs.QUIT
         }
 
+        # Events received while waiting, handled with the next poll
+        self.pending_events: List[pygame.event.Event] = list()
+
     def get_latest_inputs(self) -> List[Inputs]:
         input_list = list()
-        for event in pygame.event.get():
+        events = self.pending_events + pygame.event.get()
+        self.pending_events.clear()
+        for event in events:
             if event.type == pygame.QUIT:
-                log.info(f"Quitting the game!")
+                log.info("Quitting the game!")
                 pygame.quit()
                 sys.exit()
 
@@ -39,6 +46,14 @@ class PygameKeyboardHandler(InputHandler):
                     input_list.append(self.key_mapping[event.key])
 
         if input_list:
-            log.debug(f"Registered the following entries: {input_list}")
+            log.debug("Registered the following entries: %s", input_list)
 
         return input_list
+
+    def wait_for_inputs(self, timeout: float):
+        if timeout <= 0:
+            return
+        # A timeout of 0 ms would mean waiting forever
+        event = pygame.event.wait(max(1, math.ceil(timeout * 1000)))
+        if event.type != pygame.NOEVENT:
+            self.pending_events.append(event)
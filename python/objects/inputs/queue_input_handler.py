@@ -0,0 +1,35 @@
+import asyncio
+from typing import List
+
+from .input_handler import InputHandler
+from .inputs import Inputs
+
+
+class QueueInputHandler(InputHandler):
+    """Input handler fed by other coroutines, such as network clients or bots.
+
+    Inputs pushed with push() are returned by the next poll, and
+    wait_for_inputs_async() returns as soon as one arrives.
+    """
+
+    def __init__(self) -> None:
+        self.pending_inputs: List[Inputs] = list()
+        self.input_received = asyncio.Event()
+
+    def push(self, input: Inputs):
+        self.pending_inputs.append(input)
+        self.input_received.set()
+
+    def get_latest_inputs(self) -> List[Inputs]:
+        inputs = self.pending_inputs
+        self.pending_inputs = list()
+        self.input_received.clear()
+        return inputs
+
+    async def wait_for_inputs_async(self, timeout: float):
+        if self.pending_inputs:
+            return
+        try:
+            await asyncio.wait_for(self.input_received.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,18 @@
+from typing import Iterable, List
+
+from .input_handler import InputHandler
+from .inputs import Inputs
+
+
+class ScriptedInputHandler(InputHandler):
+    """Input handler replaying a fixed script, for benchmarks and bots.
+
+    Each poll returns the next entry of the script, and nothing once the
+    script is over.
+    """
+
+    def __init__(self, script: Iterable[List[Inputs]]) -> None:
+        self.script = iter(script)
+
+    def get_latest_inputs(self) -> List[Inputs]:
+        return next(self.script, list())
@@ -0,0 +1,39 @@
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import Optional
+
+FORMAT = "%(message)s"
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queue handler leaving all formatting to the listener thread.
+
+    QueueHandler formats records before enqueuing them, which would still
+    cost the game loop a string formatting per trace line. Records are
+    enqueued as is instead; log arguments must therefore not be mutated
+    after the call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(level: str = "INFO",
+                  handler: Optional[logging.Handler] = None) -> QueueListener:
+    """Send log records to handler from a background thread.
+
+    The game loop only pays for pushing records on a queue, never for
+    formatting or console output.
+    """
+    if handler is None:
+        handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(FORMAT, datefmt="[%X]"))
+
+    log_queue: SimpleQueue = SimpleQueue()
+    listener = QueueListener(log_queue, handler)
+    logging.basicConfig(level=level, handlers=[DeferredQueueHandler(log_queue)])
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
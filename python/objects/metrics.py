@@ -0,0 +1,221 @@
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from time import perf_counter_ns
+from typing import Callable, Dict, Iterator, List, Tuple
+
+# Histograms keep 2 ** SUB_BUCKET_BITS buckets per power of two of the
+# upper half, so recorded values are within 1/64 of their true value
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+# Largest value told apart from the others, in ns, about 18 minutes
+MAX_VALUE = (1 << 40) - 1
+
+# Upper bounds, in seconds, of the buckets exported to Prometheus
+PROMETHEUS_BUCKETS = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                      0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5]
+PERCENTILES = [50, 90, 99, 99.9]
+
+
+def bucket_index(value: int) -> int:
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return (shift << (SUB_BUCKET_BITS - 1)) + (value >> shift)
+
+
+def bucket_bounds(index: int) -> Tuple[int, int]:
+    """Smallest and largest value counted in the bucket at index."""
+    if index < SUB_BUCKET_COUNT:
+        return index, index
+    shift, offset = divmod(index - SUB_BUCKET_HALF, SUB_BUCKET_HALF)
+    lowest = (SUB_BUCKET_HALF + offset) << shift
+    return lowest, lowest + (1 << shift) - 1
+
+
+class LatencyHistogram:
+    """HDR-style histogram of durations in nanoseconds.
+
+    Buckets are linear within each power of two, so recording is a few
+    integer operations and a counter increment whatever the value, and
+    percentiles are accurate to 1/64 of the value from nanoseconds to
+    minutes. Memory is fixed, about 20 kB.
+    """
+
+    def __init__(self) -> None:
+        # A list rather than an array, whose items are slower to update
+        self.counts: List[int] = [0] * (bucket_index(MAX_VALUE) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = MAX_VALUE
+        self.max = 0
+
+    def record(self, value: int):
+        # bucket_index() inlined, this runs several times per tick
+        if value < SUB_BUCKET_COUNT:
+            if value < 0:
+                value = 0
+            self.counts[value] += 1
+        else:
+            if value > MAX_VALUE:
+                value = MAX_VALUE
+            shift = value.bit_length() - SUB_BUCKET_BITS
+            self.counts[(shift << (SUB_BUCKET_BITS - 1)) + (value >> shift)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+    def snapshot(self) -> "LatencyHistogram":
+        """Copy whose count always matches its buckets, for reading a
+        histogram another thread records into."""
+        copy = LatencyHistogram.__new__(LatencyHistogram)
+        # Copying a list is atomic, unlike reading the count and the
+        # buckets one after the other. The total, min and max may include
+        # the values recorded meanwhile
+        copy.counts = list(self.counts)
+        copy.count = sum(copy.counts)
+        copy.total, copy.min, copy.max = self.total, self.min, self.max
+        return copy
+
+    def __buckets(self) -> Iterator[Tuple[int, int, int]]:
+        """(smallest value, largest value, count) of every bucket holding values."""
+        for index, count in enumerate(self.counts):
+            if count:
+                yield (*bucket_bounds(index), count)
+
+    def percentile(self, percentile: float) -> int:
+        if not self.count:
+            return 0
+        rank = max(1, round(self.count * percentile / 100))
+        seen = 0
+        for _, highest, count in self.__buckets():
+            seen += count
+            if seen >= rank:
+                return min(highest, self.max)
+        return self.max
+
+    def cumulative_counts(self, bounds: List[int]) -> List[int]:
+        """Values at most each of bounds, which must be sorted.
+
+        A bucket straddling a bound is split in proportion to the part of
+        its range on each side, as if its values were spread evenly over
+        it. Ranges are first narrowed to the min and max recorded, so a
+        bucket only holding values at the bound counts under it.
+        """
+        cumulative = list()
+        buckets = self.__narrowed_buckets()
+        seen = 0
+        pending = next(buckets, None)
+        for bound in bounds:
+            while pending is not None and pending[1] <= bound:
+                seen += pending[2]
+                pending = next(buckets, None)
+            below = 0
+            if pending is not None and pending[0] <= bound:
+                lowest, highest, count = pending
+                below = count * (bound - lowest + 1) // (highest - lowest + 1)
+            cumulative.append(seen + below)
+        return cumulative
+
+    def __narrowed_buckets(self) -> Iterator[Tuple[int, int, int]]:
+        for lowest, highest, count in self.__buckets():
+            # The min and max of a snapshot may not match its buckets yet
+            if max(lowest, self.min) <= min(highest, self.max):
+                lowest, highest = max(lowest, self.min), min(highest, self.max)
+            yield lowest, highest, count
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ns": self.mean,
+            "min_ns": self.min if self.count else 0,
+            "max_ns": self.max,
+            **{f"p{percentile:g}_ns": self.percentile(percentile) for percentile in PERCENTILES},
+        }
+
+
+@dataclass
+class Metrics:
+    """Timers and counters of a running game, exportable to a file.
+
+    Written as Prometheus text for files ending in .prom, to be picked up
+    by node_exporter's textfile collector, and as JSON otherwise.
+    """
+    # Prefix of every exported metric name
+    namespace: str = "snake"
+
+    timers: Dict[str, LatencyHistogram] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+
+    def timer(self, name: str) -> LatencyHistogram:
+        histogram = self.timers.get(name)
+        if histogram is None:
+            histogram = self.timers[name] = LatencyHistogram()
+        return histogram
+
+    def record(self, name: str, elapsed_ns: int):
+        self.timer(name).record(elapsed_ns)
+
+    def increment(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_counter(self, name: str, value: int):
+        """For counters kept elsewhere, such as dropped inputs."""
+        self.counters[name] = value
+
+    def timed(self, name: str, function: Callable) -> Callable:
+        """function, recording the duration of every call under name."""
+        histogram = self.timer(name)
+
+        def timed_function(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.record(perf_counter_ns() - start)
+
+        return timed_function
+
+    def to_json(self) -> Dict:
+        return {
+            "timers": {name: histogram.snapshot().summary() for name, histogram in self.timers.items()},
+            "counters": dict(self.counters),
+        }
+
+    def to_prometheus(self) -> str:
+        lines: List[str] = list()
+        for name, value in self.counters.items():
+            metric = f"{self.namespace}_{name}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+
+        bounds = [round(bound * 1e9) for bound in PROMETHEUS_BUCKETS]
+        for name, histogram in self.timers.items():
+            histogram = histogram.snapshot()
+            metric = f"{self.namespace}_{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for bound, count in zip(PROMETHEUS_BUCKETS, histogram.cumulative_counts(bounds)):
+                lines.append(f'{metric}_bucket{{le="{bound:g}"}} {count}')
+            lines += [f'{metric}_bucket{{le="+Inf"}} {histogram.count}',
+                      f"{metric}_sum {histogram.total / 1e9:.9f}",
+                      f"{metric}_count {histogram.count}"]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Replace path atomically, readers never see a partial file."""
+        if path.endswith(".prom"):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.to_json(), indent=2)
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, suffix=".tmp") as temporary:
+            temporary.write(content)
+        os.replace(temporary.name, path)
@@ -0,0 +1,194 @@
+import logging
+import math
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from enum import Enum, auto
+from random import Random
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .food import FoodFactory
+from .grid import Grid
+from .renderers.renderer import Renderer
+from .snake import Snake, SnakeDirection, SnakeEvent, SnakeUpdate
+from .tiles import CellKind
+
+log = logging.getLogger(__package__)
+
+# Directions a player can queue ahead, one is applied per tick
+MAX_PENDING_DIRECTIONS = 3
+
+
+class PlayerEvent(Enum):
+    SPAWNED = auto()
+    DIED = auto()
+
+
+@dataclass
+class Player:
+    id: int
+    snake: Optional[Snake] = None
+    # Tick from which a dead player can spawn again
+    respawn_tick: int = 0
+    best_length: int = 0
+
+    def __post_init__(self):
+        self.pending_directions: Deque[SnakeDirection] = deque()
+
+    @property
+    def alive(self) -> bool:
+        return self.snake is not None
+
+
+@dataclass
+class MultiplayerEngine:
+    """Clock-free rules for many snakes sharing one grid.
+
+    Every snake moves at once on each step(). A snake dies when it leaves
+    the grid, runs into any snake's body, moves into the same cell as
+    another snake's head or swaps cells with it head-on; the tail of a
+    snake moving without eating is free to enter. Dead snakes are cleared from the grid and respawn at a
+    random free cell after respawn_delay ticks.
+    """
+    grid: Grid
+    food_factory: FoodFactory = field(default_factory=FoodFactory)
+    # Food kept on the grid for each player, at least one
+    food_per_player: float = 1
+    respawn_delay: int = 10
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.seed is not None:
+            self.food_factory.seed(self.seed)
+        self.players: Dict[int, Player] = dict()
+        self.tick_count = 0
+        self.food_count = 0
+        self.__next_player_id = 0
+        self.__spawn_food()
+
+    @staticmethod
+    def headless(row_count: int, col_count: int, seed: Optional[int] = None,
+                 **kwargs) -> "MultiplayerEngine":
+        # Updates are tracked, they are what the server broadcasts
+        renderer = Renderer(window_width=col_count, window_height=row_count)
+        grid = Grid(row_count=row_count, col_count=col_count, renderer=renderer)
+        return MultiplayerEngine(grid=grid, food_factory=FoodFactory(rng=Random(seed)),
+                                 seed=seed, **kwargs)
+
+    def add_player(self) -> Player:
+        """New player, spawned on the next step."""
+        player = Player(id=self.__next_player_id, respawn_tick=self.tick_count)
+        self.__next_player_id += 1
+        self.players[player.id] = player
+        return player
+
+    def remove_player(self, player: Player):
+        self.__kill(player)
+        del self.players[player.id]
+
+    def push_direction(self, player: Player, direction: SnakeDirection):
+        if len(player.pending_directions) < MAX_PENDING_DIRECTIONS:
+            player.pending_directions.append(direction)
+
+    def __spawn(self, player: Player) -> bool:
+        if not self.grid.empty_positions:
+            return False
+        x, y = self.grid.empty_positions.random_choice(self.food_factory.rng.randrange)
+        player.snake = Snake(initial_x=x, initial_y=y)
+        player.pending_directions.clear()
+        self.grid.add_tile(player.snake.segments[0])
+        return True
+
+    def __kill(self, player: Player):
+        if player.snake is None:
+            return
+        for tile in player.snake.segments:
+            self.grid.remove_tile(x=tile.x, y=tile.y)
+        player.best_length = max(player.best_length, player.snake.length)
+        player.snake = None
+        player.respawn_tick = self.tick_count + self.respawn_delay
+
+    def __spawn_food(self):
+        target = max(1, math.ceil(len(self.players) * self.food_per_player))
+        while self.food_count < target and self.grid.empty_positions:
+            self.grid.add_tile(self.food_factory.spawn_food(self.grid.empty_positions))
+            self.food_count += 1
+
+    def __is_inside(self, x: int, y: int) -> bool:
+        return 0 <= x < self.grid.col_count and 0 <= y < self.grid.row_count
+
+    def step(self) -> List[Tuple[Player, PlayerEvent]]:
+        """Advance every snake by one tick, returning who spawned and died."""
+        events: List[Tuple[Player, PlayerEvent]] = list()
+        moves: List[Tuple[Player, int, int]] = list()
+        for player in self.players.values():
+            snake = player.snake
+            if snake is None:
+                if self.tick_count >= player.respawn_tick and self.__spawn(player):
+                    events.append((player, PlayerEvent.SPAWNED))
+                continue
+            if player.pending_directions:
+                snake.direction = player.pending_directions.popleft()
+            if snake.direction != SnakeDirection.STOPPED:
+                x_delta, y_delta = snake.movement_deltas[snake.direction]
+                moves.append((player, snake.x + x_delta, snake.y + y_delta))
+
+        # Collisions are decided on the positions before the move, so the
+        # order players are processed in doesn't matter
+        cells = self.grid.cells
+        col_count = self.grid.col_count
+        heads = Counter((x, y) for _, x, y in moves)
+        # Tails leaving their cell this tick, with the snake they belong to
+        vacated: Dict[Tuple[int, int], Player] = dict()
+        for player, x, y in moves:
+            if not (self.__is_inside(x, y) and cells[y * col_count + x] == CellKind.FOOD):
+                tail = player.snake.segments[-1]
+                vacated[(tail.x, tail.y)] = player
+
+        # Two heads swapping cells would pass through each other, with the
+        # tails they enter leaving at the same time
+        destinations = {player.id: (x, y) for player, x, y in moves}
+        previous_heads = {(player.snake.x, player.snake.y): player for player, _, _ in moves}
+
+        dead: List[Player] = list()
+        movers: List[Tuple[Player, int, int]] = list()
+        for player, x, y in moves:
+            facing = previous_heads.get((x, y))
+            if (not self.__is_inside(x, y) or heads[(x, y)] > 1
+                    or (facing is not None
+                        and destinations[facing.id] == (player.snake.x, player.snake.y))
+                    or (cells[y * col_count + x] == CellKind.SNAKE
+                        and vacated.get((x, y), player) is player)):
+                dead.append(player)
+            else:
+                movers.append((player, x, y))
+
+        for player in dead:
+            self.__kill(player)
+            events.append((player, PlayerEvent.DIED))
+
+        updates: List[SnakeUpdate] = list()
+        for player, x, y in movers:
+            eats = cells[y * col_count + x] == CellKind.FOOD
+            update = player.snake.update(food_x=x if eats else -1, food_y=y if eats else -1)
+            if update.event == SnakeEvent.ATE_FOOD:
+                self.food_count -= 1
+            updates.append(update)
+
+        # A head may enter the cell another snake's tail leaves, so every
+        # tail is removed before any head is added
+        for update in updates:
+            for x, y in update.removed:
+                self.grid.remove_tile(x=x, y=y)
+        for update in updates:
+            for tile in update.added:
+                self.grid.add_tile(tile=tile)
+
+        self.__spawn_food()
+        self.tick_count += 1
+        return events
+
+    def take_updated_cells(self) -> List[int]:
+        """Indexes of the cells changed since the last call, each once."""
+        updated_cells = list(dict.fromkeys(self.grid.updated_cells))
+        self.grid.updated_cells.clear()
+        return updated_cells
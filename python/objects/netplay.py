@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import struct
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from enum import IntEnum
+from time import perf_counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from .multiplayer import MultiplayerEngine, Player, PlayerEvent
+from .scheduler import FixedTimestepScheduler
+from .snake import SnakeDirection
+
+log = logging.getLogger(__package__)
+
+# Every server message starts with its type and the size of what follows.
+# Clients only send directions, one SnakeDirection value byte each.
+MESSAGE_HEADER = struct.Struct("<BI")
+# player id, column count, row count, tick count, then the zlib compressed
+# CellKind byte of every cell
+WELCOME = struct.Struct("<IIIq")
+# tick count, updated cell count, then the updated cell indexes as uint32
+# and their new CellKind bytes
+DELTA = struct.Struct("<qI")
+# alive, head x, head y, length
+PLAYER = struct.Struct("<?iiI")
+
+# Pending connections the server accepts at once, players tend to join
+# together when a game starts
+CONNECTION_BACKLOG = 1024
+
+# Clients buffering more than this many unsent bytes are too slow to keep
+# up, they're disconnected rather than slowing the tick down
+MAX_CLIENT_BUFFER = 1 << 20
+
+
+class MessageType(IntEnum):
+    WELCOME = 1
+    DELTA = 2
+    PLAYER = 3
+
+
+def encode_message(type: MessageType, payload: bytes) -> bytes:
+    return MESSAGE_HEADER.pack(type, len(payload)) + payload
+
+
+def encode_delta(tick_count: int, cells: bytearray, updated_cells: List[int]) -> bytes:
+    kinds = bytes(cells[index] for index in updated_cells)
+    return encode_message(MessageType.DELTA, DELTA.pack(tick_count, len(updated_cells))
+                          + array("I", updated_cells).tobytes() + kinds)
+
+
+def decode_delta(payload: bytes) -> Tuple[int, array, bytes]:
+    tick_count, count = DELTA.unpack_from(payload)
+    indexes = array("I")
+    end = DELTA.size + count * indexes.itemsize
+    indexes.frombytes(payload[DELTA.size:end])
+    return tick_count, indexes, payload[end:end + count]
+
+
+@dataclass
+class ServerStats:
+    ticks: int = 0
+    total_time: float = 0
+    max_time: float = 0
+    bytes_broadcast: int = 0
+    dropped_clients: int = 0
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.ticks if self.ticks else 0
+
+    def record_tick(self, elapsed: float, broadcast: int):
+        self.ticks += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.bytes_broadcast += broadcast
+
+
+@dataclass
+class GameServer:
+    """Authoritative multiplayer server over TCP.
+
+    The engine advances at a fixed tick rate. After each tick, the cells
+    that changed are encoded once and the same message is written to every
+    client; clients get the whole grid only when they join.
+    """
+    engine: MultiplayerEngine
+    tick_rate: float = 10  # in ticks/sec
+
+    stats: ServerStats = field(default_factory=ServerStats)
+
+    def __post_init__(self):
+        self.scheduler = FixedTimestepScheduler(tick_rate=self.tick_rate)
+        self.clients: Dict[int, asyncio.StreamWriter] = dict()
+        self.client_tasks: Set[asyncio.Task] = set()
+
+    def __welcome(self, player: Player) -> bytes:
+        grid = self.engine.grid
+        return encode_message(MessageType.WELCOME,
+                              WELCOME.pack(player.id, grid.col_count, grid.row_count,
+                                           self.engine.tick_count)
+                              + zlib.compress(grid.cells, 1))
+
+    def __send(self, player_id: int, message: bytes):
+        writer = self.clients[player_id]
+        if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+            log.warning("Dropping player %d, too far behind", player_id)
+            self.stats.dropped_clients += 1
+            del self.clients[player_id]
+            writer.close()
+            return
+        writer.write(message)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        player = self.engine.add_player()
+        self.clients[player.id] = writer
+        task = asyncio.current_task()
+        self.client_tasks.add(task)
+        log.info("Player %d joined from %s", player.id, writer.get_extra_info("peername"))
+        try:
+            writer.write(self.__welcome(player))
+            while player.id in self.clients:
+                data = await reader.read(64)
+                if not data:
+                    break
+                for value in data:
+                    try:
+                        self.engine.push_direction(player, SnakeDirection(value))
+                    except ValueError:
+                        log.warning("Player %d sent an invalid direction: %d", player.id, value)
+        except (ConnectionError, asyncio.CancelledError):
+            # Cancelled when the server is interrupted, the connection is
+            # closed all the same
+            pass
+        finally:
+            self.clients.pop(player.id, None)
+            self.engine.remove_player(player)
+            writer.close()
+            self.client_tasks.discard(task)
+            log.info("Player %d left", player.id)
+
+    def __tick(self):
+        start = perf_counter()
+        events = self.engine.step()
+        message = encode_delta(self.engine.tick_count, self.engine.grid.cells,
+                               self.engine.take_updated_cells())
+        for player_id in list(self.clients):
+            self.__send(player_id, message)
+
+        for player, event in events:
+            if player.id not in self.clients:
+                continue
+            snake = player.snake
+            alive = event == PlayerEvent.SPAWNED
+            self.__send(player.id, encode_message(MessageType.PLAYER, PLAYER.pack(
+                alive, snake.x if alive else -1, snake.y if alive else -1,
+                snake.length if alive else player.best_length)))
+
+        self.stats.record_tick(perf_counter() - start, len(message) * len(self.clients))
+
+    async def run(self, ticks: Optional[int] = None):
+        """Run the game, forever or until ticks ticks have been played."""
+        self.scheduler.restart()
+        while ticks is None or self.engine.tick_count < ticks:
+            while self.scheduler.tick_due() and (ticks is None or self.engine.tick_count < ticks):
+                self.__tick()
+            await self.scheduler.wait_next_tick()
+
+    async def serve(self, host: str, port: int, ticks: Optional[int] = None):
+        server = await asyncio.start_server(self.handle_client, host, port, backlog=CONNECTION_BACKLOG)
+        log.info("Serving on %s", ", ".join(str(sock.getsockname()) for sock in server.sockets))
+        async with server:
+            await self.run(ticks)
+            # Closing the connections ends their handlers, rather than
+            # having them cancelled when the loop stops
+            for writer in self.clients.values():
+                writer.close()
+            await asyncio.gather(*self.client_tasks, return_exceptions=True)
+
+
+class GameClient:
+    """Client side of the protocol, keeping a copy of the grid up to date."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.player_id = -1
+        self.col_count = 0
+        self.row_count = 0
+        self.tick_count = 0
+        self.cells = bytearray()
+        self.alive = False
+        self.head: Tuple[int, int] = (-1, -1)
+        self.length = 0
+
+    @staticmethod
+    async def connect(host: str, port: int) -> "GameClient":
+        reader, writer = await asyncio.open_connection(host, port)
+        client = GameClient(reader, writer)
+        if await client.receive() != MessageType.WELCOME:
+            raise ConnectionError("Expected a welcome message")
+        return client
+
+    def send_direction(self, direction: SnakeDirection):
+        # Messages still buffered can be read after the server has closed
+        if not self.writer.is_closing():
+            self.writer.write(bytes((direction.value,)))
+
+    async def receive(self) -> Optional[MessageType]:
+        """Apply the next message, None when the server closed."""
+        try:
+            type, size = MESSAGE_HEADER.unpack(await self.reader.readexactly(MESSAGE_HEADER.size))
+            payload = await self.reader.readexactly(size)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+
+        type = MessageType(type)
+        if type == MessageType.DELTA:
+            self.tick_count, indexes, kinds = decode_delta(payload)
+            for index, kind in zip(indexes, kinds):
+                self.cells[index] = kind
+        elif type == MessageType.WELCOME:
+            self.player_id, self.col_count, self.row_count, self.tick_count = WELCOME.unpack_from(payload)
+            self.cells = bytearray(zlib.decompress(payload[WELCOME.size:]))
+        elif type == MessageType.PLAYER:
+            self.alive, head_x, head_y, self.length = PLAYER.unpack(payload)
+            self.head = (head_x, head_y)
+        return type
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            # Already closed by the server
+            pass
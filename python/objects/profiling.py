@@ -0,0 +1,168 @@
+import cProfile
+import logging
+import pstats
+import signal
+import sys
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+log = logging.getLogger(__package__)
+
+
+@dataclass
+class Profiler(ABC):
+    """Profiler switched on and off while the game runs.
+
+    Each stop() saves what was collected since the matching start() to path,
+    so a running game can be profiled over just the moments of interest.
+    """
+    path: str
+
+    def __post_init__(self):
+        self.running = False
+
+    @abstractmethod
+    def _start(self):
+        ...
+
+    @abstractmethod
+    def _stop(self):
+        ...
+
+    def follow_thread(self):
+        """Called between ticks by loops running outside the thread toggling
+        the profiler, for profilers that only see the threads they run in."""
+
+    def leave_thread(self):
+        """Called by those loops when they end."""
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self._start()
+            log.info("%s started", type(self).__name__)
+
+    def stop(self):
+        if self.running:
+            self.running = False
+            log.info("%s stopped", type(self).__name__)
+            self._stop()
+
+    def toggle(self):
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    def install_signal(self):
+        """Toggle on SIGUSR1, which can only be done from the main thread."""
+        if not hasattr(signal, "SIGUSR1"):
+            log.warning("No SIGUSR1 on this platform, the profiler can't be toggled")
+            return
+        signal.signal(signal.SIGUSR1, lambda *_: self.toggle())
+
+
+@dataclass
+class CProfileProfiler(Profiler):
+    """Deterministic profile, saved for pstats.
+
+    cProfile only sees the thread it is enabled in, so each thread gets a
+    profile of its own: the thread toggling the profiler right away, others
+    when they next call follow_thread(). Stats of every thread are merged
+    once the last of them has stopped. Slows the profiled threads down a
+    lot while running; the sampling profiler is cheaper.
+    """
+
+    def __post_init__(self):
+        super().__post_init__()
+        # Reentrant, the signal toggling the profiler may interrupt its own
+        # thread while it holds the lock
+        self.__lock = threading.RLock()
+        self.__profiles: Dict[int, cProfile.Profile] = dict()
+        self.__finished: List[cProfile.Profile] = list()
+
+    def _start(self):
+        self.follow_thread()
+
+    def _stop(self):
+        self.follow_thread()
+
+    def follow_thread(self):
+        thread_id = threading.get_ident()
+        with self.__lock:
+            profile = self.__profiles.get(thread_id)
+            if self.running and profile is None:
+                self.__profiles[thread_id] = cProfile.Profile()
+                self.__profiles[thread_id].enable()
+            elif not self.running and profile is not None:
+                self.__finish(thread_id)
+
+    def leave_thread(self):
+        with self.__lock:
+            if threading.get_ident() in self.__profiles:
+                self.__finish(threading.get_ident())
+
+    def __finish(self, thread_id: int):
+        # Profiles can only be disabled from their own thread
+        profile = self.__profiles.pop(thread_id)
+        profile.disable()
+        self.__finished.append(profile)
+        if not self.running and not self.__profiles:
+            stats = pstats.Stats(*self.__finished)
+            stats.dump_stats(self.path)
+            self.__finished.clear()
+            log.info("Profile saved to %s", self.path)
+
+
+@dataclass
+class SamplingProfiler(Profiler):
+    """Samples the stacks of every thread from a thread of its own.
+
+    Saved as folded stacks, one "frame;frame;frame count" line per stack,
+    the input of flamegraph.pl and speedscope. The cost is that of one
+    sample per interval, whatever the game does in between.
+    """
+    interval: float = 0.005  # in seconds
+
+    stacks: Dict[str, int] = field(default_factory=Counter)
+
+    def _start(self):
+        self.stacks.clear()
+        self.__stopped = threading.Event()
+        self.__thread = threading.Thread(target=self.__sample, name="SamplingProfiler", daemon=True)
+        self.__thread.start()
+
+    def _stop(self):
+        self.__stopped.set()
+        if self.__thread is not threading.current_thread():
+            self.__thread.join()
+        with open(self.path, "w") as file:
+            for stack, count in self.stacks.items():
+                file.write(f"{stack} {count}\n")
+        log.info("Profile saved to %s", self.path)
+
+    def __sample(self):
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self.__stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack = list()
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+
+PROFILERS = {
+    "cprofile": CProfileProfiler,
+    "sampling": SamplingProfiler,
+}
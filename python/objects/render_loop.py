@@ -0,0 +1,164 @@
+import logging
+from dataclasses import dataclass, field
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .grid import Grid
+from .tiles import TILE_STYLES, CellKind
+
+log = logging.getLogger(__package__)
+
+Position = Tuple[int, int]
+
+
+class TickFrame(NamedTuple):
+    """What the renderer needs from one tick, never changed once published."""
+    tick_count: int
+    # When the tick was published and the time until the next one
+    time: float
+    period: float
+    # (index, CellKind) of every cell the tick changed
+    changes: Tuple[Tuple[int, int], ...]
+    # Where the head and the tail moved from and to, None if they didn't
+    head_move: Optional[Tuple[Position, Position]]
+    tail_move: Optional[Tuple[Position, Position]]
+
+
+class FrameBuffer:
+    """Ticks handed from the simulation to the renderer.
+
+    The simulation appends ticks to a back buffer, which the renderer swaps
+    for an empty one on each frame. The lock only guards the swap, so a slow
+    frame never holds up a tick, and a renderer running behind still gets
+    every change, at the cost of skipping the frames in between.
+    """
+
+    def __init__(self) -> None:
+        self.__lock = Lock()
+        self.__back: List[TickFrame] = list()
+
+    def publish(self, frame: TickFrame):
+        with self.__lock:
+            self.__back.append(frame)
+
+    def take(self) -> List[TickFrame]:
+        with self.__lock:
+            frames, self.__back = self.__back, list()
+        return frames
+
+
+@dataclass
+class RenderStats:
+    frames: int = 0
+    total_time: float = 0
+    max_time: float = 0
+    # Ticks published but never shown on their own frame
+    skipped_ticks: int = 0
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.frames if self.frames else 0
+
+    def record_frame(self, elapsed: float, ticks: int):
+        self.frames += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.skipped_ticks += max(0, ticks - 1)
+
+
+@dataclass
+class RenderLoop:
+    """Draws the ticks of a FrameBuffer at its own frame rate.
+
+    It keeps its own copy of the cells, so it never reads the grid the
+    simulation is changing, only its size and renderer. With interpolation
+    the head and tail slide between cells over the tick period instead of
+    jumping. It's turned off for renderers that only draw on cells, see
+    Renderer.draws_between_cells.
+    """
+    grid: Grid
+    frame_buffer: FrameBuffer
+    frame_rate: float = 60  # in frames/sec
+    interpolate: bool = False
+    clock: Callable[[], float] = monotonic
+
+    stats: RenderStats = field(default_factory=RenderStats)
+
+    def __post_init__(self):
+        if self.interpolate and not self.grid.renderer.draws_between_cells:
+            log.warning("%s only draws on cells, rendering without interpolation",
+                        type(self.grid.renderer).__name__)
+            self.interpolate = False
+        # CellKind codes of the cells that aren't empty, by index, sparse
+        # so that it fits chunked grids too large for a byte per cell
+        self.cells: Dict[int, int] = dict(self.grid.occupied_cells())
+        self.latest: Optional[TickFrame] = None
+        # Cells under the sliding tiles of the last frame, redrawn on the next
+        self.overlay_cells: List[int] = list()
+        self.next_frame = self.clock()
+
+    @property
+    def period(self) -> float:
+        return 1 / self.frame_rate
+
+    def __index(self, position: Position) -> int:
+        return position[1] * self.grid.col_count + position[0]
+
+    def __draw_tile(self, x: float, y: float, kind: int):
+        style = TILE_STYLES[kind]
+        self.grid.renderer.add_shape_to_frame(
+            x=int(x * self.grid.tile_width), y=int(y * self.grid.tile_height),
+            shape_width=int(self.grid.tile_width), shape_height=int(self.grid.tile_height),
+            shape=style.shape, shape_color=style.color)
+
+    def __slide(self, move: Optional[Tuple[Position, Position]],
+                progress: float) -> Optional[Tuple[Position, Position, float]]:
+        # Moves wrapping around the grid jump rather than slide
+        if move is None or abs(move[1][0] - move[0][0]) + abs(move[1][1] - move[0][1]) != 1:
+            return None
+        return move[0], move[1], progress
+
+    def draw_frame(self):
+        start = self.clock()
+        self.next_frame = start + self.period
+        frames = self.frame_buffer.take()
+        dirty = self.overlay_cells
+        for frame in frames:
+            for index, kind in frame.changes:
+                if kind == CellKind.EMPTY:
+                    self.cells.pop(index, None)
+                else:
+                    self.cells[index] = kind
+                dirty.append(index)
+        if frames:
+            self.latest = frames[-1]
+
+        slides = list()
+        # The cell the head is entering stays empty until the head reaches
+        # it, the one the tail left already is
+        hidden = -1
+        latest = self.latest
+        if self.interpolate and latest is not None and start - latest.time < latest.period:
+            progress = (start - latest.time) / latest.period
+            head_slide = self.__slide(latest.head_move, progress)
+            tail_slide = self.__slide(latest.tail_move, progress)
+            if head_slide is not None:
+                hidden = self.__index(head_slide[1])
+            slides = [slide for slide in (head_slide, tail_slide) if slide is not None]
+        self.overlay_cells = list()
+        for source, destination, _ in slides:
+            self.overlay_cells.extend((self.__index(source), self.__index(destination)))
+        dirty.extend(self.overlay_cells)
+
+        for index in dict.fromkeys(dirty):
+            y, x = divmod(index, self.grid.col_count)
+            self.__draw_tile(x, y, CellKind.EMPTY if index == hidden else self.cells.get(index, CellKind.EMPTY))
+        for (source_x, source_y), (destination_x, destination_y), progress in slides:
+            self.__draw_tile(source_x + (destination_x - source_x) * progress,
+                             source_y + (destination_y - source_y) * progress, CellKind.SNAKE)
+        self.grid.renderer.draw_frame()
+        self.stats.record_frame(self.clock() - start, len(frames))
+
+    def time_until_next_frame(self) -> float:
+        return max(0.0, self.next_frame - self.clock())
@@ -0,0 +1,69 @@
+import gzip
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+import numpy
+import pygame
+
+from .pygame_renderer import PygameRenderer
+
+
+class FrameSink:
+    """Appends frames to a file as raw RGB24, gzip compressed if asked.
+
+    Raw files can be read back with numpy.fromfile, or encoded with
+    ffmpeg -f rawvideo -pix_fmt rgb24 -s <width>x<height> -i <path>.
+    """
+
+    def __init__(self, path: str, compress: bool = False, compresslevel: int = 1) -> None:
+        self.path = path
+        self.file: BinaryIO = (gzip.open(path, "wb", compresslevel=compresslevel)
+                               if compress else open(path, "wb"))
+        self.frame_count = 0
+
+    def write(self, frame: numpy.ndarray):
+        # Frames are contiguous, their buffer is written without a copy
+        self.file.write(frame.data)
+        self.frame_count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self) -> "FrameSink":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@dataclass
+class OffscreenRenderer(PygameRenderer):
+    """Pygame renderer drawing into memory instead of a window.
+
+    The surface draws straight into a NumPy array of shape (height, width,
+    3) in RGB order, so frame is always the latest frame without any copy.
+    No display is opened, which runs anywhere, including headless machines
+    with the SDL dummy driver.
+    """
+    # Blits and frame sink writes don't need the display thread
+    offload_draw = True
+
+    frame_sink: Optional[FrameSink] = None
+
+    def _create_window(self) -> pygame.Surface:
+        # Surfaces made by frombuffer share the array's memory, unlike
+        # surfarray views they don't lock the surface while they're alive
+        self.frame = numpy.zeros((self.window_height, self.window_width, 3), dtype=numpy.uint8)
+        self.frame_count = 0
+        return pygame.image.frombuffer(self.frame, (self.window_width, self.window_height), "RGB")
+
+    def _present(self):
+        self.dirty_rects.clear()
+        self.dirty_area = 0
+        self.full_redraw = False
+
+    def draw_frame(self):
+        super().draw_frame()
+        self.frame_count += 1
+        if self.frame_sink is not None:
+            self.frame_sink.write(self.frame)
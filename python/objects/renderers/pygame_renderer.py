@@ -1,5 +1,6 @@
 import logging
 from dataclasses import dataclass
+from typing import Dict, List, Tuple
 
 import pygame
 
@@ -10,15 +11,32 @@ log = logging.getLogger(__package__)
 
 @dataclass
 class PygameRenderer(Renderer):
+    # SDL windows are only reliably updated from the thread that opened them,
+    # so draw_frame_async() presents on the event loop thread
+    offload_draw = False
+
+    draws_between_cells = True
+
+    # Share of the window above which a single flip is cheaper than
+    # updating each dirty rect
+    full_flip_threshold: float = 0.3
+
     def __post_init__(self):
-        if not pygame.display.get_init():
-            pygame.display.init()
-        self.window = pygame.display.set_mode(
-            (self.window_width, self.window_height))
+        self.window = self._create_window()
+
+        self.dirty_rects: List[pygame.Rect] = list()
+        self.dirty_area = 0
+        self.full_redraw = True
+
+        # Each (shape, color, size) is rasterized once into a sprite, and
+        # every frame is drawn with a single blits() call
+        self.sprite_cache: Dict[Tuple[Shapes, Colors, int, int], pygame.Surface] = dict()
+        self.sprite_size: Tuple[int, int] = (0, 0)
+        self.pending_blits: List[Tuple[pygame.Surface, Tuple[int, int]]] = list()
 
         self.shape_constructors = {
-            Shapes.CIRCLE: self._draw_circle,
-            Shapes.SQUARE: self._draw_square
+            Shapes.CIRCLE: pygame.draw.ellipse,
+            Shapes.SQUARE: pygame.draw.rect
         }
 
         self.color_map = {
@@ -28,25 +46,31 @@ class PygameRenderer(Renderer):
             Colors.WHITE: "white"
         }
 
-        self.window.fill(self.color_map[self.window_bgcolor])
-        self.draw_frame()
+        self.reset_frame()
+        self._present()
 
-    def _draw_circle(self, x: int, y: int,
-                     shape_width: int,
-                     shape_height: int,
-                     shape_color: Colors = Colors.BLACK):
-        log.debug(f"Drawing circle at: {(x, y)} in {shape_color}")
-        rect = pygame.Rect(x, y, shape_width, shape_height)
-        pygame.draw.ellipse(self.window, self.color_map[shape_color], rect)
+    def _create_window(self) -> pygame.Surface:
+        if not pygame.display.get_init():
+            pygame.display.init()
+        return pygame.display.set_mode((self.window_width, self.window_height))
 
+    def _get_sprite(self, shape: Shapes, shape_color: Colors,
+                    shape_width: int, shape_height: int) -> pygame.Surface:
+        if (shape_width, shape_height) != self.sprite_size:
+            # Tile size changed, sprites of the previous size won't be used again
+            self.sprite_cache.clear()
+            self.sprite_size = (shape_width, shape_height)
 
-    def _draw_square(self, x: int, y: int,
-                     shape_width: int,
-                     shape_height: int,
-                     shape_color: Colors = Colors.BLACK):
-        log.debug(f"Drawing square at: {(x, y)} in {shape_color}")
-        rect = pygame.Rect(x, y, shape_width, shape_height)
-        pygame.draw.rect(self.window, self.color_map[shape_color], rect)
+        key = (shape, shape_color, shape_width, shape_height)
+        sprite = self.sprite_cache.get(key)
+        if sprite is None:
+            log.debug("Rendering %s sprite in %s", shape, shape_color)
+            sprite = pygame.Surface((shape_width, shape_height), 0, self.window)
+            sprite.fill(self.color_map[self.window_bgcolor])
+            self.shape_constructors[shape](
+                sprite, self.color_map[shape_color], sprite.get_rect())
+            self.sprite_cache[key] = sprite
+        return sprite
 
     def add_shape_to_frame(self, x: int, y: int,
                            shape_width: int,
@@ -55,7 +79,31 @@ class PygameRenderer(Renderer):
                            shape_color: Colors = Colors.BLACK):
         if shape_color is None:
             shape_color = self.window_bgcolor
-        return self.shape_constructors[shape](x, y, shape_width, shape_height, shape_color)
+        sprite = self._get_sprite(shape, shape_color, shape_width, shape_height)
+        self.pending_blits.append((sprite, (x, y)))
+        self.dirty_rects.append(pygame.Rect(x, y, shape_width, shape_height))
+        self.dirty_area += shape_width * shape_height
+
+    def reset_frame(self):
+        self.pending_blits.clear()
+        self.window.fill(self.color_map[self.window_bgcolor])
+        self.full_redraw = True
+
+    def _blit_pending(self):
+        if self.pending_blits:
+            self.window.blits(self.pending_blits, doreturn=False)
+            self.pending_blits.clear()
+
+    def _present(self):
+        window_area = self.window_width * self.window_height
+        if self.full_redraw or self.dirty_area > self.full_flip_threshold * window_area:
+            pygame.display.flip()
+        elif self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
+        self.dirty_rects.clear()
+        self.dirty_area = 0
+        self.full_redraw = False
 
     def draw_frame(self):
-        pygame.display.flip()
+        self._blit_pending()
+        self._present()
@@ -1,3 +1,4 @@
+import asyncio
 from enum import Enum, auto
 from dataclasses import dataclass
 
@@ -16,6 +17,14 @@ class Shapes(Enum):
 
 @dataclass
 class Renderer:
+    # Presentation blocking on I/O is run in a worker thread by
+    # draw_frame_async(). Backends whose windowing library must be driven
+    # by the thread that created it keep this off
+    offload_draw = False
+    # Whether shapes can be drawn at any pixel position rather than only on
+    # the cells of the grid, which interpolated rendering needs
+    draws_between_cells = False
+
     window_width: int
     window_height: int
 
@@ -28,8 +37,18 @@ class Renderer:
                            shape_color: Colors = Colors.BLACK):
         pass
 
+    def set_grid_size(self, col_count: int, row_count: int):
+        """Called by the grid drawing on this renderer, for backends working
+        in cells rather than pixels."""
+
     def reset_frame(self):
         pass
 
     def draw_frame(self):
         pass
+
+    async def draw_frame_async(self):
+        if self.offload_draw:
+            await asyncio.to_thread(self.draw_frame)
+        else:
+            self.draw_frame()
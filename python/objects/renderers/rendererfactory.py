@@ -1,15 +1,24 @@
 from enum import Enum
+from typing import Union
 
-from .pygame_renderer import PygameRenderer
+from ..backends import BackendRegistry
 from .renderer import Colors, Renderer
-from .terminal_renderer import TerminalRenderer
-from .turtle_renderer import TurtleRenderer
+
+# Backends are only imported when first used, so headless runs never load
+# pygame or tkinter. Plugins add their own with RENDERERS.register().
+RENDERERS: BackendRegistry[Renderer] = BackendRegistry("renderer", {
+    "turtle": f"{__package__}.turtle_renderer:TurtleRenderer",
+    "terminal": f"{__package__}.terminal_renderer:TerminalRenderer",
+    "pygame": f"{__package__}.pygame_renderer:PygameRenderer",
+    "offscreen": f"{__package__}.offscreen_renderer:OffscreenRenderer",
+})
 
 
 class RendererType(Enum):
-    TURTLE = TurtleRenderer
-    TERMINAL = TerminalRenderer
-    PYGAME = PygameRenderer
+    TURTLE = "turtle"
+    TERMINAL = "terminal"
+    PYGAME = "pygame"
+    OFFSCREEN = "offscreen"
 
 
 class RendererFactory:
@@ -17,8 +26,9 @@ class RendererFactory:
     def get_renderer(window_width: int,
                      window_height: int,
                      window_bgcolor: Colors = Colors.WHITE,
-                     type: RendererType = RendererType.TURTLE) -> Renderer:
-        renderer_consturctor = type.value
+                     type: Union[RendererType, str] = RendererType.TURTLE) -> Renderer:
+        name = type.value if isinstance(type, RendererType) else type
+        renderer_consturctor = RENDERERS.get(name)
         return renderer_consturctor(window_width=window_width,
                                     window_height=window_height,
                                     window_bgcolor=window_bgcolor)
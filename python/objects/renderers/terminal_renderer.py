@@ -1,4 +1,7 @@
+import sys
 from dataclasses import dataclass
+from typing import List, Optional, TextIO
+
 from .renderer import Renderer, Shapes, Colors
 
 TERMINAL_SHAPE_DICT = {
@@ -6,35 +9,118 @@ TERMINAL_SHAPE_DICT = {
     Shapes.SQUARE: "■",
 }
 
+# ANSI foreground color codes
 TERMINAL_COLORS_DICT = {
-    Colors.WHITE: "white",
-    Colors.BLACK: "black",
-    Colors.BLUE: "blue",
-    Colors.RED:  "red",
+    Colors.WHITE: "37",
+    Colors.BLACK: "30",
+    Colors.BLUE: "34",
+    Colors.RED:  "31",
 }
 
+EMPTY_CELL = " "
+
 
 @dataclass
 class TerminalRenderer(Renderer):
+    """Renders the grid as one character per tile.
+
+    The renderer keeps what is on screen (front buffer) and the frame being
+    built (back buffer) at grid resolution. Each frame only moves the cursor
+    to the cells that changed and writes everything at once.
+    """
+    # Writes to slow terminals and pipes block
+    offload_draw = True
+
+    stream: Optional[TextIO] = None
+
     def __post_init__(self):
-        self.frame_buffer = [" "] * self.window_width * self.window_height
+        if self.stream is None:
+            self.stream = sys.stdout
+        self.cell_width = 0
+        self.cell_height = 0
+        self.col_count = 0
+        self.row_count = 0
+        # Whether the counts come from the grid rather than the tile size
+        self.grid_sized = False
+        self.back_buffer: List[str] = list()
+        self.front_buffer: List[str] = list()
+        self.dirty_cells: List[int] = list()
+        self.full_redraw = True
+
+    def set_grid_size(self, col_count: int, row_count: int):
+        self.col_count = col_count
+        self.row_count = row_count
+        self.grid_sized = True
+        self.reset_frame()
 
-    def add_shape_to_frame(self, x: int, y: int, shape: Shapes = Shapes.CIRCLE, shape_width: int = None, shape_height: int = None, shape_color: Colors = Colors.BLACK):
-        character = TERMINAL_SHAPE_DICT[shape]
-        index = int(y * self.window_width + x)
+    def __resize(self, cell_width: int, cell_height: int):
+        # Without a grid, pixel sizes are only known once the first tile is
+        # drawn
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.col_count = max(1, round(self.window_width / cell_width))
+        self.row_count = max(1, round(self.window_height / cell_height))
+        self.reset_frame()
 
-        print(x, y, index)
-        print()
+    def add_shape_to_frame(self, x: int, y: int, shape_width: int, shape_height: int, shape: Shapes = Shapes.CIRCLE, shape_color: Colors = Colors.BLACK):
+        if self.grid_sized:
+            # Grids place cell col at int(col * window_width / col_count),
+            # the smallest col reaching x is the cell, whatever the rounding
+            col = -(-x * self.col_count // self.window_width)
+            row = -(-y * self.row_count // self.window_height)
+        else:
+            if (shape_width, shape_height) != (self.cell_width, self.cell_height):
+                self.__resize(shape_width, shape_height)
+            col = round(x / shape_width)
+            row = round(y / shape_height)
+        col = min(max(col, 0), self.col_count - 1)
+        row = min(max(row, 0), self.row_count - 1)
+        index = row * self.col_count + col
 
-        self.frame_buffer[index] = character
+        if shape_color is None:
+            cell = EMPTY_CELL
+        else:
+            cell = f"\033[{TERMINAL_COLORS_DICT[shape_color]}m{TERMINAL_SHAPE_DICT[shape]}\033[0m"
+
+        self.back_buffer[index] = cell
+        self.dirty_cells.append(index)
+
+    def reset_frame(self):
+        # The next frame clears the screen, leaving every cell empty
+        cell_count = self.col_count * self.row_count
+        self.back_buffer = [EMPTY_CELL] * cell_count
+        self.front_buffer = [EMPTY_CELL] * cell_count
+        self.dirty_cells = list()
+        self.full_redraw = True
+
+    def __draw_border(self, output: List[str]):
+        frame_border = "#" * (self.col_count + 2)
+        output.append(f"\033[2J\033[H{frame_border}")
+        for row in range(self.row_count):
+            output.append(f"\033[{row + 2};1H#\033[{row + 2};{self.col_count + 2}H#")
+        output.append(f"\033[{self.row_count + 2};1H{frame_border}")
 
     def draw_frame(self):
-        print("\033[2J")
-        frame_border = "#" * (self.window_width + 2)
-        print(frame_border)
-        for line in range(self.window_height):
-            line_start = line * self.window_height
-            line_end = line_start + self.window_width
-            line_str = "".join(self.frame_buffer[line_start:line_end])
-            print(f"#{line_str}#")
-        print(frame_border)
+        if not self.col_count:
+            return
+
+        output: List[str] = list()
+        if self.full_redraw:
+            self.__draw_border(output)
+            self.full_redraw = False
+
+        for index in self.dirty_cells:
+            cell = self.back_buffer[index]
+            if self.front_buffer[index] == cell:
+                continue
+            self.front_buffer[index] = cell
+            row, col = divmod(index, self.col_count)
+            # Cursor positions are 1-based and the border takes one cell
+            output.append(f"\033[{row + 2};{col + 2}H{cell}")
+        self.dirty_cells.clear()
+
+        if output:
+            # Park the cursor under the board
+            output.append(f"\033[{self.row_count + 3};1H")
+            self.stream.write("".join(output))
+            self.stream.flush()
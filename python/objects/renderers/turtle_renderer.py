@@ -1,8 +1,10 @@
 from dataclasses import dataclass
 from .renderer import Renderer, Shapes, Colors
 
+import math
 import turtle
 import logging
+from typing import Dict, List, Tuple
 
 log = logging.getLogger(__package__)
 
@@ -13,9 +15,15 @@ TURTLE_COLORS_DICT = {
     Colors.RED:  "red",
 }
 
+CIRCLE_POINTS = 24
+
 
 @dataclass
 class TurtleRenderer(Renderer):
+    # Tk isn't thread-safe, draw_frame_async() presents on the event loop
+    # thread
+    offload_draw = False
+
     def __post_init__(self):
         self.window = turtle.Screen()
         self.window.title("Snake Game")
@@ -23,65 +31,73 @@ class TurtleRenderer(Renderer):
         self.window.setup(width=self.window_width, height=self.window_height)
         self.window.tracer(0)
 
+        # Every cell owns at most one polygon on the turtle canvas, which is
+        # moved and recolored instead of drawing a new turtle per shape, so
+        # the number of canvas items is bounded by the number of cells
+        self.canvas = self.window.getcanvas()
+        self.cell_items: Dict[Tuple[int, int], int] = dict()
+        self.shape_polygons: Dict[Tuple[Shapes, int, int], List[float]] = dict()
+
         self.turtle_shape_dict = {
-            Shapes.CIRCLE: self._draw_circle,
-            Shapes.SQUARE: self._draw_square,
+            Shapes.CIRCLE: self._circle_polygon,
+            Shapes.SQUARE: self._square_polygon,
         }
 
-    def _draw_square(self, x_top_left: int, y_top_left: int, x_bot_right: int, y_bot_right: int):
-        self.turtle.goto(x_top_left, y_top_left)
-        log.debug(f"turtle at {(x_top_left, y_top_left)}")
-
-        self.turtle.setheading(0)
-        self.turtle.pendown()
-
-        x_delta = x_bot_right - x_top_left
-        y_delta = y_bot_right - y_top_left
-
-        for _ in range(2):
-            self.turtle.forward(x_delta)
-            self.turtle.left(90)
-            self.turtle.forward(y_delta)
-            self.turtle.left(90)
-
-        self.turtle.penup()
-
-    def _draw_circle(self, x_top_left: int, y_top_left: int, x_bot_right: int, y_bot_right: int):
-        x = x_top_left + int((x_bot_right - x_top_left)/2)
-        y = y_top_left
-        self.turtle.goto(x, y)
-        log.debug(f"turtle at {(x, y)}")
-        self.turtle.setheading(180)
-        self.turtle.pendown()
-        self.turtle.circle((x_bot_right - x_top_left)/2)
-        self.turtle.penup()
+    def _square_polygon(self, shape_width: int, shape_height: int) -> List[float]:
+        return [0, 0, shape_width, 0, shape_width, shape_height, 0, shape_height]
+
+    def _circle_polygon(self, shape_width: int, shape_height: int) -> List[float]:
+        x_radius = shape_width / 2
+        y_radius = shape_height / 2
+        points: List[float] = list()
+        for index in range(CIRCLE_POINTS):
+            angle = 2 * math.pi * index / CIRCLE_POINTS
+            points.append(x_radius + x_radius * math.cos(angle))
+            points.append(y_radius + y_radius * math.sin(angle))
+        return points
+
+    def __get_polygon(self, shape: Shapes, shape_width: int, shape_height: int) -> List[float]:
+        key = (shape, shape_width, shape_height)
+        polygon = self.shape_polygons.get(key)
+        if polygon is None:
+            polygon = self.turtle_shape_dict[shape](shape_width, shape_height)
+            self.shape_polygons[key] = polygon
+        return polygon
+
+    @property
+    def item_count(self) -> int:
+        return len(self.canvas.find_all())
 
     def add_shape_to_frame(self, x: int, y: int, shape_width: int, shape_height: int, shape: Shapes = Shapes.CIRCLE, shape_color: Colors = Colors.BLACK):
-        self.turtle = turtle.Turtle()
-        self.turtle.speed(0)
-        self.turtle.penup()
-        self.turtle.hideturtle()
-        if shape_color == None:
-            self.turtle.pencolor(TURTLE_COLORS_DICT[self.window_bgcolor])
+        item = self.cell_items.get((x, y))
+
+        if shape_color is None:
+            # Empty cells show the background, the item is kept for reuse
+            if item is not None:
+                self.canvas.itemconfigure(item, state="hidden")
+            return
+
+        # The turtle canvas has (0,0) in the middle of the window
+        x_offset = x - self.window_width / 2
+        y_offset = y - self.window_height / 2
+        polygon = self.__get_polygon(shape, shape_width, shape_height)
+        coords = [value + (y_offset if index % 2 else x_offset)
+                  for index, value in enumerate(polygon)]
+
+        color = TURTLE_COLORS_DICT[shape_color]
+        log.debug("shape color: %s", shape_color)
+
+        if item is None:
+            self.cell_items[(x, y)] = self.canvas.create_polygon(
+                *coords, fill=color, outline=color)
         else:
-            self.turtle.pencolor(TURTLE_COLORS_DICT[shape_color])
-        self.turtle.fillcolor(self.turtle.pencolor())
-
-        # Move (0,0) coordonates in the top left corner and invert the y axis
-        x = x - int(self.window_width/2)
-        y = int(self.window_height/2) - y
-
-        log.debug(f"shape color: {shape_color}")
-
-        self.turtle.begin_fill()
-        self.turtle_shape_dict[shape](x_top_left=x,
-                                      y_top_left=y,
-                                      x_bot_right=(x + shape_width),
-                                      y_bot_right=(y - shape_height))
-        self.turtle.end_fill()
+            self.canvas.coords(item, *coords)
+            self.canvas.itemconfigure(item, fill=color, outline=color, state="normal")
 
     def reset_frame(self):
-        self.window.clearscreen()
+        for item in self.cell_items.values():
+            self.canvas.delete(item)
+        self.cell_items.clear()
 
     def draw_frame(self):
         self.window.update()
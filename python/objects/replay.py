@@ -0,0 +1,163 @@
+import struct
+from dataclasses import dataclass
+from time import sleep
+from typing import Iterator, List, Optional, Tuple
+
+from .chunked_grid import ChunkedGrid
+from .engine import GameEngine
+from .food import FoodFactory
+from .grid import Grid
+from .renderers.renderer import Renderer
+from .snake import Snake, SnakeDirection
+
+MAGIC = b"SNKR"
+VERSION = 2
+# magic, version, seed, row count, col count, initial x, initial y, ticks,
+# final state hash, flags
+HEADER = struct.Struct("<4sBqIIIII16sB")
+# Version 1 replays have no flags, their grids neither wrap nor are chunked,
+# and an unsigned seed
+HEADER_V1 = struct.Struct("<4sBQIIIII16s")
+SEED_RANGE = range(-2**63, 2**63)
+HEADERS = {1: HEADER_V1, VERSION: HEADER}
+
+# Flags of the grid, which change how the game plays out
+WRAP = 1
+CHUNKED = 2
+
+DIRECTIONS = (SnakeDirection.UP, SnakeDirection.DOWN, SnakeDirection.LEFT,
+              SnakeDirection.RIGHT, SnakeDirection.STOPPED)
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+DIRECTION_BITS = 3
+
+
+def encode_varint(value: int, output: bytearray):
+    while value >= 0x80:
+        output.append((value & 0x7F) | 0x80)
+        value >>= 7
+    output.append(value)
+
+
+def decode_varints(data: bytes) -> Iterator[int]:
+    value = 0
+    shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value = 0
+            shift = 0
+
+
+def encode_direction_changes(changes: List[Tuple[int, SnakeDirection]]) -> bytes:
+    # One varint per change: ticks since the previous change, with the
+    # direction code in the low bits
+    output = bytearray()
+    previous_tick = 0
+    for tick, direction in changes:
+        encode_varint(((tick - previous_tick) << DIRECTION_BITS) | DIRECTION_CODES[direction], output)
+        previous_tick = tick
+    return bytes(output)
+
+
+@dataclass
+class Replay:
+    seed: int
+    row_count: int
+    col_count: int
+    initial_x: int
+    initial_y: int
+    tick_count: int
+    final_hash: bytes
+    direction_changes: bytes
+    wrap: bool = False
+    chunked: bool = False
+
+    @staticmethod
+    def from_engine(engine: GameEngine) -> "Replay":
+        if engine.seed is None or engine.direction_changes is None:
+            raise ValueError("Only seeded games recorded from their first tick can be replayed")
+        if engine.seed not in SEED_RANGE:
+            raise ValueError("Only games seeded with a signed 64-bit integer can be replayed")
+        return Replay(seed=engine.seed,
+                      row_count=engine.grid.row_count, col_count=engine.grid.col_count,
+                      initial_x=engine.snake.initial_x, initial_y=engine.snake.initial_y,
+                      tick_count=engine.tick_count, final_hash=engine.state_hash(),
+                      direction_changes=encode_direction_changes(engine.direction_changes),
+                      wrap=engine.grid.wrap, chunked=isinstance(engine.grid, ChunkedGrid))
+
+    def changes(self) -> Iterator[Tuple[int, SnakeDirection]]:
+        tick = 0
+        for value in decode_varints(self.direction_changes):
+            tick += value >> DIRECTION_BITS
+            yield tick, DIRECTIONS[value & ((1 << DIRECTION_BITS) - 1)]
+
+    def to_bytes(self) -> bytes:
+        return HEADER.pack(MAGIC, VERSION, self.seed, self.row_count, self.col_count,
+                           self.initial_x, self.initial_y, self.tick_count, self.final_hash,
+                           (WRAP if self.wrap else 0) | (CHUNKED if self.chunked else 0)
+                           ) + self.direction_changes
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "Replay":
+        header = HEADERS.get(data[4]) if data[:4] == MAGIC else None
+        if header is None:
+            raise ValueError("Not a snake replay or unsupported replay version")
+        values = header.unpack_from(data)
+        _, _, *fields, final_hash = values[:9]
+        flags = values[9] if header is HEADER else 0
+        return Replay(*fields, final_hash=final_hash,
+                      direction_changes=bytes(data[header.size:]),
+                      wrap=bool(flags & WRAP), chunked=bool(flags & CHUNKED))
+
+    def save(self, path: str):
+        with open(path, "wb") as replay_file:
+            replay_file.write(self.to_bytes())
+
+    @staticmethod
+    def load(path: str) -> "Replay":
+        with open(path, "rb") as replay_file:
+            return Replay.from_bytes(replay_file.read())
+
+
+def play(replay: Replay, renderer: Optional[Renderer] = None, tick_delay: float = 0) -> GameEngine:
+    """Runs the replay through the engine and returns it in its final state.
+
+    Without a renderer the game runs headless, as fast as possible.
+    """
+    if renderer is None:
+        renderer = Renderer(window_width=replay.col_count, window_height=replay.row_count)
+        headless = True
+    else:
+        headless = False
+
+    grid_type = ChunkedGrid if replay.chunked else Grid
+    grid = grid_type(row_count=replay.row_count, col_count=replay.col_count,
+                     renderer=renderer, track_updates=not headless, wrap=replay.wrap)
+    engine = GameEngine(grid=grid,
+                        snake=Snake(initial_x=replay.initial_x, initial_y=replay.initial_y),
+                        food_factory=FoodFactory(), seed=replay.seed)
+
+    changes = replay.changes()
+    next_change = next(changes, None)
+    if not headless:
+        grid.draw()
+
+    while engine.tick_count < replay.tick_count:
+        action = None
+        if next_change is not None and next_change[0] == engine.tick_count:
+            action = next_change[1]
+            next_change = next(changes, None)
+        engine.step(action)
+
+        if not headless:
+            grid.draw()
+            sleep(tick_delay)
+
+    return engine
+
+
+def verify(replay: Replay) -> bool:
+    return play(replay).state_hash() == replay.final_hash
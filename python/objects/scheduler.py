@@ -0,0 +1,77 @@
+import asyncio
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Callable
+
+
+@dataclass
+class FrameStats:
+    ticks: int = 0
+    # Ticks that ran after the next one was already due, plus ticks dropped
+    # because the loop fell too far behind
+    missed_deadlines: int = 0
+    max_jitter: float = 0
+    total_jitter: float = 0
+
+    @property
+    def mean_jitter(self) -> float:
+        return self.total_jitter / self.ticks if self.ticks else 0
+
+    def record_tick(self, lateness: float, missed: bool):
+        self.ticks += 1
+        self.total_jitter += lateness
+        self.max_jitter = max(self.max_jitter, lateness)
+        if missed:
+            self.missed_deadlines += 1
+
+
+@dataclass
+class FixedTimestepScheduler:
+    """Fixed timestep tick scheduler.
+
+    Deadlines advance by exactly one period per tick, so the time spent
+    updating and drawing doesn't make the game drift. When the caller falls
+    behind, tick_due() keeps returning True until the missed ticks are
+    caught up, up to max_catch_up_ticks in a row.
+    """
+    tick_rate: float  # in ticks/sec
+    max_catch_up_ticks: int = 5
+    clock: Callable[[], float] = monotonic
+
+    stats: FrameStats = field(default_factory=FrameStats)
+
+    def __post_init__(self):
+        self.restart()
+
+    @property
+    def period(self) -> float:
+        return 1 / self.tick_rate
+
+    def restart(self):
+        self.next_deadline = self.clock() + self.period
+        self.__catch_up_ticks = 0
+
+    def time_until_next_tick(self) -> float:
+        return max(0.0, self.next_deadline - self.clock())
+
+    async def wait_next_tick(self):
+        await asyncio.sleep(self.time_until_next_tick())
+
+    def tick_due(self) -> bool:
+        lateness = self.clock() - self.next_deadline
+        if lateness < 0:
+            self.__catch_up_ticks = 0
+            return False
+
+        if self.__catch_up_ticks >= self.max_catch_up_ticks:
+            # Too far behind, drop the backlog rather than spiralling
+            skipped = int(lateness / self.period) + 1
+            self.stats.missed_deadlines += skipped
+            self.next_deadline += skipped * self.period
+            self.__catch_up_ticks = 0
+            return False
+
+        self.__catch_up_ticks += 1
+        self.stats.record_tick(lateness, missed=lateness >= self.period)
+        self.next_deadline += self.period
+        return True
@@ -1,10 +1,10 @@
 import logging
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import List
+from typing import Deque, Iterable, Optional, Set, Tuple
 
-from .renderers.renderer import Colors, Shapes
-from .tiles import Tile
+from .tiles import CellKind, Tile, TileDelta
 
 log = logging.getLogger(__package__)
 
@@ -24,9 +24,13 @@ class SnakeEvent(Enum):
 
 
 @dataclass
+class SnakeUpdate(TileDelta):
+    event: SnakeEvent = SnakeEvent.NO_EVENT
+
+
+@dataclass(slots=True)
 class SnakeTile(Tile):
-    shape: Shapes = Shapes.SQUARE
-    color: Colors = Colors.BLACK
+    kind: CellKind = CellKind.SNAKE
 
 
 @dataclass
@@ -34,13 +38,22 @@ class Snake:
     initial_x: int
     initial_y: int
 
-    segments: List[Tile] = field(default_factory=list)
+    segments: Deque[Tile] = field(default_factory=deque)
+    # Column and row counts of a wrapping grid, the snake comes back on the
+    # opposite side instead of leaving it
+    wrap_size: Optional[Tuple[int, int]] = None
 
     def __post_init__(self):
         self.__direction: SnakeDirection = SnakeDirection.STOPPED
+        self.segments = deque(self.segments)
         if not self.segments:
             self.segments.append(SnakeTile(x=self.initial_x, y=self.initial_y))
 
+        # Positions covered by the body, kept in sync with segments so that
+        # self-bite checks don't have to walk the whole body
+        self.__occupied: Set[Tuple[int, int]] = {
+            (tile.x, tile.y) for tile in self.segments}
+
         self.movement_deltas = {
             SnakeDirection.UP: (0, -1),
             SnakeDirection.DOWN: (0, 1),
@@ -49,7 +62,7 @@ class Snake:
             SnakeDirection.STOPPED: (0, 0),
         }
 
-        self.length = 1
+        self.length = len(self.segments)
 
         self.forbiden_moves = {
             SnakeDirection.UP: SnakeDirection.DOWN,
@@ -60,6 +73,16 @@ class Snake:
         }
 
 
+    def reset(self):
+        self.restore([(self.initial_x, self.initial_y)], SnakeDirection.STOPPED)
+
+    def restore(self, positions: Iterable[Tuple[int, int]], direction: SnakeDirection):
+        """Replace the body, head first, and the direction."""
+        self.__direction = direction
+        self.segments = deque(SnakeTile(x=x, y=y) for x, y in positions)
+        self.__occupied = {(tile.x, tile.y) for tile in self.segments}
+        self.length = len(self.segments)
+
     @property
     def x(self):
         return self.segments[0].x
@@ -68,6 +91,9 @@ class Snake:
     def y(self):
         return self.segments[0].y
 
+    def occupies(self, x: int, y: int) -> bool:
+        return (x, y) in self.__occupied
+
     @property
     def direction(self):
         return self.__direction
@@ -77,11 +103,10 @@ class Snake:
         if self.forbiden_moves[self.direction] != direction:
             self.__direction = direction
 
-    def __move(self, food_x: int, food_y: int) -> SnakeEvent:
-        ret = SnakeEvent.NO_EVENT
+    def __move(self, food_x: int, food_y: int) -> SnakeUpdate:
+        ret = SnakeUpdate()
 
-        log.debug(
-            f"Moving snake, direction: {self.direction}")
+        log.debug("Moving snake, direction: %s", self.direction)
 
         food_touched = False
 
@@ -89,33 +114,42 @@ class Snake:
 
         x_delta, y_delta = self.movement_deltas[self.direction]
 
-        new_head = SnakeTile(x=(head.x + x_delta), y=(head.y + y_delta))
+        new_x, new_y = head.x + x_delta, head.y + y_delta
+        if self.wrap_size is not None:
+            new_x %= self.wrap_size[0]
+            new_y %= self.wrap_size[1]
 
-        if new_head.x == food_x and new_head.y == food_y:
+        if new_x == food_x and new_y == food_y:
             food_touched = True
 
-        for x, y in [(tile.x, tile.y) for tile in self.segments]:
-            if new_head.x == x and new_head.y == y:
-                ret = SnakeEvent.SELF_BITE
-                break
-
-        self.segments.insert(0, new_head)
+        if (new_x, new_y) in self.__occupied:
+            ret.event = SnakeEvent.SELF_BITE
 
         if food_touched:
-            self.length += 1
-            ret = SnakeEvent.ATE_FOOD
-            log.info(f"Snake ate food at {(new_head.x, new_head.y)}")
             # To grow, don't erase the last bit of tail
+            new_head = SnakeTile(x=new_x, y=new_y)
+            self.length += 1
+            ret.event = SnakeEvent.ATE_FOOD
+            log.info("Snake ate food at (%d, %d)", new_x, new_y)
         else:
-            # Removing the tail
-            self.segments.pop()
-
-        log.debug(f"Snakes coordinates: {(self.x, self.y)}, Snake lenght: {self.length}")
+            # The tail tile becomes the new head, moving doesn't allocate
+            new_head = self.segments.pop()
+            tail = (new_head.x, new_head.y)
+            if tail != (new_x, new_y):
+                self.__occupied.discard(tail)
+            ret.removed.append(tail)
+            new_head.x, new_head.y = new_x, new_y
+
+        self.segments.appendleft(new_head)
+        self.__occupied.add((new_x, new_y))
+        ret.added.append(new_head)
+
+        log.debug("Snakes coordinates: (%d, %d), Snake lenght: %d", self.x, self.y, self.length)
         return ret
 
-    def update(self, food_x: int, food_y: int) -> SnakeEvent:
+    def update(self, food_x: int, food_y: int) -> SnakeUpdate:
         log.debug("Updating the snake")
         if self.direction != SnakeDirection.STOPPED:
             return self.__move(food_x, food_y)
         else:
-            return SnakeEvent.NO_EVENT
+            return SnakeUpdate()
@@ -1,10 +1,50 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+
 from .renderers.renderer import Shapes, Colors
 
 
-@dataclass
+class CellKind(IntEnum):
+    # Stored one byte per cell by the grid, an empty cell is a zero byte
+    EMPTY = 0
+    SNAKE = 1
+    FOOD = 2
+    WALL = 3
+
+
+@dataclass(frozen=True, slots=True)
+class TileStyle:
+    shape: Shapes = Shapes.SQUARE
+    color: Optional[Colors] = None
+
+
+# Shared by every tile of a kind, tiles only carry their position
+TILE_STYLES: Dict[CellKind, TileStyle] = {
+    CellKind.EMPTY: TileStyle(),
+    CellKind.SNAKE: TileStyle(Shapes.SQUARE, Colors.BLACK),
+    CellKind.FOOD: TileStyle(Shapes.CIRCLE, Colors.RED),
+    CellKind.WALL: TileStyle(Shapes.SQUARE, Colors.BLUE),
+}
+
+
+@dataclass(slots=True)
 class Tile:
     x: int
     y: int
-    shape: Shapes = Shapes.SQUARE
-    color: Colors = None
+    kind: CellKind = CellKind.EMPTY
+
+    @property
+    def shape(self) -> Shapes:
+        return TILE_STYLES[self.kind].shape
+
+    @property
+    def color(self) -> Optional[Colors]:
+        return TILE_STYLES[self.kind].color
+
+
+@dataclass
+class TileDelta:
+    added: List[Tile] = field(default_factory=list)
+    # Only the positions of removed tiles, the snake reuses their objects
+    removed: List[Tuple[int, int]] = field(default_factory=list)
@@ -0,0 +1,68 @@
+#! python3
+"""Verifies or plays back recorded snake games"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
+
+from objects.renderers.renderer import Colors
+from objects.renderers.rendererfactory import RendererFactory, RendererType
+from objects.replay import Replay, play, verify
+
+
+def verify_file(path: str) -> Tuple[str, bool]:
+    return path, verify(Replay.load(path))
+
+
+def verify_files(paths: List[str], workers: int) -> Iterator[Tuple[str, bool]]:
+    if workers <= 1:
+        yield from map(verify_file, paths)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(verify_file, paths,
+                                chunksize=max(1, len(paths) // (workers * 4)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    verify_parser = subparsers.add_parser("verify", help="check that replays still reach their recorded final state")
+    verify_parser.add_argument("paths", nargs="+")
+    verify_parser.add_argument("--workers", type=int, default=os.cpu_count())
+
+    play_parser = subparsers.add_parser("play", help="show a replay")
+    play_parser.add_argument("path")
+    play_parser.add_argument("--renderer", default=RendererType.PYGAME.name,
+                             choices=[renderer_type.name for renderer_type in RendererType])
+    play_parser.add_argument("--tile-size", type=int, default=30)
+    play_parser.add_argument("--speed", type=float, default=10, help="ticks per second")
+
+    args = parser.parse_args()
+
+    if args.command == "verify":
+        failures = 0
+        for path, valid in verify_files(args.paths, args.workers):
+            if not valid:
+                failures += 1
+                print(f"{path}: final state differs")
+        print(f"{len(args.paths) - failures}/{len(args.paths)} replays verified")
+        return 1 if failures else 0
+
+    replay = Replay.load(args.path)
+    renderer = RendererFactory.get_renderer(window_width=replay.col_count * args.tile_size,
+                                            window_height=replay.row_count * args.tile_size,
+                                            window_bgcolor=Colors.WHITE,
+                                            type=RendererType[args.renderer])
+    engine = play(replay, renderer=renderer, tick_delay=1 / args.speed)
+    valid = engine.state_hash() == replay.final_hash
+    print(f"{engine.tick_count} ticks, length {engine.snake.length}, "
+          f"final state {'matches' if valid else 'differs'}")
+    return 0 if valid else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+#! python3
+"""Hosts a multiplayer snake game over TCP.
+
+Clients receive the whole grid when they join, then the cells changed by
+every tick, and send one SnakeDirection value byte per direction change.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+from objects.log_config import setup_logging
+from objects.multiplayer import MultiplayerEngine
+from objects.netplay import GameServer
+
+log = logging.getLogger("GameServer")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--board-size", type=int, default=100)
+    parser.add_argument("--tick-rate", type=float, default=10, help="ticks per second")
+    parser.add_argument("--food-per-player", type=float, default=1)
+    parser.add_argument("--respawn-delay", type=int, default=10, help="ticks before a dead snake respawns")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--ticks", type=int, help="stop after this many ticks")
+    args = parser.parse_args()
+
+    setup_logging(level=os.environ.get("SNAKE_LOG_LEVEL", "INFO"))
+
+    engine = MultiplayerEngine.headless(args.board_size, args.board_size, seed=args.seed,
+                                        food_per_player=args.food_per_player,
+                                        respawn_delay=args.respawn_delay)
+    server = GameServer(engine=engine, tick_rate=args.tick_rate)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.ticks))
+    except KeyboardInterrupt:
+        pass
+
+    stats = server.stats
+    log.info("%d ticks, mean tick %.2f ms, max tick %.2f ms, %d bytes broadcast, "
+             "%d clients dropped, %d missed deadlines",
+             stats.ticks, stats.mean_time * 1000, stats.max_time * 1000, stats.bytes_broadcast,
+             stats.dropped_clients, server.scheduler.stats.missed_deadlines)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
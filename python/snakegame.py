@@ -2,44 +2,35 @@
 """Snake game's python version"""
 
 import logging
-import math
+import os
+import random
 import sys
 from dataclasses import dataclass
-from enum import Enum, auto
-from queue import Queue
-from time import time
-from typing import List
+from threading import Thread
+from time import monotonic, sleep
+from typing import List, Optional, Tuple
 
+from objects.engine import GameEngine, GameEvent, GameState
 from objects.food import FoodFactory
 from objects.grid import Grid
+from objects.inputs.input_buffer import (CoalescingPolicy, InputBuffer,
+                                         InputLatencyStats, InputThread)
 from objects.inputs.input_handler import InputHandler, Inputs
-from objects.inputs.pygame_keyboard_handler import PygameKeyboardHandler
+from objects.inputs.inputhandlerfactory import InputHandlerFactory
+from objects.inputs.inputs import INPUT_DIRECTIONS
+from objects.log_config import setup_logging
+from objects.metrics import Metrics
+from objects.profiling import PROFILERS, Profiler
 from objects.renderers.renderer import Colors, Renderer
+from objects.render_loop import FrameBuffer, RenderLoop, TickFrame
 from objects.renderers.rendererfactory import RendererFactory, RendererType
-from objects.snake import Snake, SnakeDirection, SnakeEvent
-from rich.logging import RichHandler
-
-FORMAT = "%(message)s"
-logging.basicConfig(
-    level="DEBUG", format=FORMAT, datefmt="[%X]", handlers=[RichHandler()]
-)
+from objects.replay import Replay
+from objects.scheduler import FixedTimestepScheduler
+from objects.snake import Snake, SnakeDirection
 
 log = logging.getLogger("SnakeGame")
 
 
-class GameState(Enum):
-    GAME_INIT = auto()
-    GAME_RUNNING = auto()
-    GAME_PAUSED = auto()
-    GAME_STOPPED = auto()
-
-
-class GameEvent(Enum):
-    SPEED_UP = auto()
-    GAME_OVER = auto()
-    NO_EVENT = auto()
-
-
 @dataclass
 class SnakeGame:
     grid: Grid
@@ -48,116 +39,262 @@ class SnakeGame:
     input_handler: InputHandler
     snake_speed: float = 1  # in moves/sec
     snake_acceleration_factor: float = 0.7
+    input_coalescing: CoalescingPolicy = CoalescingPolicy.ONE_PER_TICK
+    # Pump the input handler from its own thread instead of the game loop
+    threaded_inputs: bool = False
+    seed: Optional[int] = None
+    # Where to save a replay of the game once it's over
+    replay_path: Optional[str] = None
+    # Frames per second of a renderer decoupled from the simulation, which
+    # then steps in its own thread. None draws once after every tick instead
+    frame_rate: Optional[float] = None
+    # Slide the snake between cells rather than moving it a cell per tick,
+    # only with a frame_rate
+    interpolate: bool = False
+    # Timers and counters of the game loop, written to metrics_path every
+    # metrics_interval seconds and at game over when set
+    metrics: Optional[Metrics] = None
+    metrics_path: Optional[str] = None
+    metrics_interval: float = 10  # in seconds
+    # Toggled by SIGUSR1, and stopped at game over. The simulation thread
+    # of a decoupled game follows it between ticks
+    profiler: Optional[Profiler] = None
 
     def __post_init__(self):
         self.game_state = GameState.GAME_INIT
-        for tile in self.snake.segments:
-            self.grid.add_tile(tile=tile)
-
-        self.food = self.food_facory.spawn_food(self.grid.empty_positions)
-        self.grid.add_tile(self.food)
-
-        self.key_to_direction_map = {
-            Inputs.UP: SnakeDirection.UP,
-            Inputs.RIGHT: SnakeDirection.RIGHT,
-            Inputs.LEFT: SnakeDirection.LEFT,
-            Inputs.DOWN: SnakeDirection.DOWN,
-            Inputs.PAUSE: SnakeDirection.STOPPED,
-            Inputs.QUIT: SnakeDirection.STOPPED
-        }
-
-        self.inputs = Queue(maxsize=2)
-        self.speed_level = 0
-
-    def __speed_up(self):
-        self.speed_level += 1
-        self.snake_speed += self.snake_acceleration_factor * math.log10(1 + self.speed_level)
+        if self.replay_path and self.seed is None:
+            self.seed = random.randrange(2**63)
+        elif self.replay_path:
+            # Replays store the seed as a signed 64-bit integer, larger
+            # seeds are wrapped into that range before seeding the game
+            self.seed = (self.seed + 2**63) % 2**64 - 2**63
+        self.engine = GameEngine(grid=self.grid, snake=self.snake,
+                                 food_factory=self.food_facory,
+                                 snake_speed=self.snake_speed,
+                                 snake_acceleration_factor=self.snake_acceleration_factor,
+                                 seed=self.seed)
+        if self.replay_path:
+            self.engine.start_recording()
+        self.input_handler.attach(self.engine)
+
+        self.key_to_direction_map = INPUT_DIRECTIONS
+
+        self.inputs = InputBuffer()
+        self.input_latency = InputLatencyStats()
+        self.input_thread: Optional[InputThread] = None
+        if self.threaded_inputs:
+            self.input_thread = InputThread(self.input_handler, self.inputs)
+        self.scheduler = FixedTimestepScheduler(tick_rate=self.engine.snake_speed)
+        self.frame_buffer = FrameBuffer()
+        self.render_loop: Optional[RenderLoop] = None
+        if self.metrics is not None:
+            self.__instrument(self.metrics)
+
+    def __instrument(self, metrics: Metrics):
+        # Timed by replacing the methods on this instance, so that games
+        # without metrics don't pay for checking whether they have any
+        self.__get_inputs = metrics.timed("get_inputs", self.__get_inputs)
+        self.__update = metrics.timed("update", self.__update)
+        self.__draw = metrics.timed("grid_draw", self.__draw)
+        self.grid.renderer.draw_frame = metrics.timed("draw_frame", self.grid.renderer.draw_frame)
+        # Created upfront so that exporting from another thread never sees
+        # them being added
+        for counter in ("ticks", "food_spawns", "dropped_inputs", "missed_deadlines"):
+            metrics.set_counter(counter, 0)
+        self.next_metrics_export = monotonic() + self.metrics_interval
+
+    def __export_metrics(self):
+        self.next_metrics_export = monotonic() + self.metrics_interval
+        self.metrics.set_counter("dropped_inputs", self.inputs.dropped)
+        self.metrics.set_counter("missed_deadlines", self.scheduler.stats.missed_deadlines)
+        if self.metrics_path:
+            self.metrics.write(self.metrics_path)
+
+    def __export_metrics_if_due(self):
+        if self.metrics is not None and monotonic() >= self.next_metrics_export:
+            self.__export_metrics()
+
+    @property
+    def food(self):
+        return self.engine.food
 
     def __draw(self):
         self.grid.draw()
 
     def __game_over(self):
         log.info("Game over")
+        stats = self.scheduler.stats
+        log.info("%d ticks, %d missed deadlines, mean jitter %.2f ms, max jitter %.2f ms",
+                 stats.ticks, stats.missed_deadlines, stats.mean_jitter * 1000, stats.max_jitter * 1000)
+        log.info("Input latency: mean %.2f ms, max %.2f ms, %d inputs dropped",
+                 self.input_latency.mean_latency * 1000, self.input_latency.max_latency * 1000,
+                 self.inputs.dropped)
+        if self.render_loop is not None:
+            render_stats = self.render_loop.stats
+            log.info("%d frames, mean frame %.2f ms, max frame %.2f ms, %d ticks never shown",
+                     render_stats.frames, render_stats.mean_time * 1000, render_stats.max_time * 1000,
+                     render_stats.skipped_ticks)
+        self.input_handler.log_stats()
+        if self.metrics is not None:
+            self.__export_metrics()
+            if self.metrics_path:
+                log.info("Metrics saved to %s", self.metrics_path)
+        if self.profiler is not None:
+            self.profiler.stop()
+        if self.replay_path:
+            Replay.from_engine(self.engine).save(self.replay_path)
+            log.info("Replay saved to %s", self.replay_path)
         sys.exit()
 
     def __update(self) -> GameEvent:
-        ret = GameEvent.NO_EVENT
-        snake_prev_state = [tile for tile in self.snake.segments]
-
-        if not self.inputs.empty():
-            self.snake.direction = self.key_to_direction_map[self.inputs.get_nowait()]
-
-        snake_event: SnakeEvent = self.snake.update(
-            food_x=self.food.x, food_y=self.food.y)
-
-        if snake_event == SnakeEvent.SELF_BITE:
-            return GameEvent.GAME_OVER
-
-        if self.snake.x >= self.grid.col_count or self.snake.x < 0:
-            return GameEvent.GAME_OVER
-
-        if self.snake.y >= self.grid.row_count or self.snake.y < 0:
-            return GameEvent.GAME_OVER
-
-
-        to_add = [
-            tile for tile in self.snake.segments if tile not in snake_prev_state]
-        to_remove = [
-            tile for tile in snake_prev_state if tile not in self.snake.segments]
-
-        if snake_event == SnakeEvent.ATE_FOOD:
-            self.food = self.food_facory.spawn_food(self.grid.empty_positions)
-            to_add.append(self.food)
-            log.info(f"Spawning new food at: {(self.food.x, self.food.y)}")
-            ret = GameEvent.SPEED_UP
-
-        for tile in to_add:
-            self.grid.add_tile(tile=tile)
-        for tile in to_remove:
-            self.grid.remove_tile(x=tile.x, y=tile.y)
-
-        return ret
+        now = self.inputs.clock()
+        for event in self.inputs.drain(self.input_coalescing):
+            self.input_latency.record(now - event.timestamp)
+            if event.input == Inputs.QUIT:
+                sys.exit()
+            self.snake.direction = self.key_to_direction_map[event.input]
+
+        _, game_event = self.engine.step()
+        if self.metrics is not None:
+            self.metrics.increment("ticks")
+            if game_event == GameEvent.SPEED_UP:
+                self.metrics.increment("food_spawns")
+        return game_event
 
     def __get_inputs(self):
-        inputs: List[Inputs] = self.input_handler.get_latest_inputs()
+        if self.input_thread is not None:
+            return
+        inputs: List[Inputs] = self.input_handler.pump(self.inputs)
         if Inputs.QUIT in inputs:
             sys.exit()
-        # TODO: Provide input queue
-        for input in inputs:
-            if not self.inputs.full():
-                self.inputs.put_nowait(input)
-                log.debug(f"Added {input} to input queue")
+        if inputs:
+            log.debug("Added %s to input buffer", inputs)
 
     def __game_loop(self):
-        game_loop_counter = 0
-        start_time = time()
         self.__draw()
+        self.scheduler.restart()
         while self.game_state != GameState.GAME_STOPPED:
-            game_loop_counter += 1
-
             self.__get_inputs()
-            if time() - start_time >= (1 / self.snake_speed):
+
+            updated = False
+            while self.scheduler.tick_due():
+                if updated:
+                    # Catching up, handlers reading the engine plan each
+                    # tick rather than repeat the move of the previous one
+                    self.__get_inputs()
                 game_event: GameEvent = self.__update()
                 if game_event == GameEvent.GAME_OVER:
                     self.__game_over()
                 if game_event == GameEvent.SPEED_UP:
-                    self.__speed_up()
-                    log.debug(
-                        f"Increasing speed to {self.snake_speed} moves/seconds")
+                    self.scheduler.tick_rate = self.engine.snake_speed
+                    log.debug("Increasing speed to %s moves/seconds", self.engine.snake_speed)
+                updated = True
 
+            if updated:
                 self.__draw()
-                start_time = time()
+            self.__export_metrics_if_due()
+
+            timeout = self.scheduler.time_until_next_tick()
+            if self.input_thread is None:
+                self.input_handler.wait_for_inputs(timeout)
+            else:
+                sleep(timeout)
+
+    def __publish_tick(self, game_event: GameEvent, head: Tuple[int, int],
+                       tail: Tuple[int, int], length: int):
+        snake = self.snake
+        moved = game_event != GameEvent.GAME_OVER and (snake.x, snake.y) != head
+        changes = tuple((index, self.grid.cell_at(index)) for index in dict.fromkeys(self.grid.updated_cells))
+        self.grid.updated_cells.clear()
+        self.frame_buffer.publish(TickFrame(
+            tick_count=self.engine.tick_count, time=self.scheduler.clock(),
+            period=self.scheduler.period, changes=changes,
+            head_move=(head, (snake.x, snake.y)) if moved else None,
+            # The tail stays put while the snake grows
+            tail_move=(tail, (snake.segments[-1].x, snake.segments[-1].y))
+            if moved and snake.length == length else None))
+
+    def __simulate(self):
+        self.scheduler.restart()
+        try:
+            while self.game_state == GameState.GAME_RUNNING:
+                if self.profiler is not None:
+                    self.profiler.follow_thread()
+
+                while self.game_state == GameState.GAME_RUNNING and self.scheduler.tick_due():
+                    # Pumped before every tick, catch-up ones included
+                    if self.input_handler.reads_engine:
+                        self.input_handler.pump(self.inputs)
+                    head, tail = self.snake.segments[0], self.snake.segments[-1]
+                    head_position, tail_position = (head.x, head.y), (tail.x, tail.y)
+                    length = self.snake.length
+                    game_event = self.__update()
+                    self.__publish_tick(game_event, head_position, tail_position, length)
+                    if game_event == GameEvent.GAME_OVER:
+                        self.game_state = GameState.GAME_STOPPED
+                    elif game_event == GameEvent.SPEED_UP:
+                        self.scheduler.tick_rate = self.engine.snake_speed
+
+                sleep(self.scheduler.time_until_next_tick())
+        except SystemExit:
+            # Quitting from this thread would only end the thread, the
+            # render loop ends the game instead
+            self.game_state = GameState.GAME_STOPPED
+        finally:
+            if self.profiler is not None:
+                self.profiler.leave_thread()
+
+    def __decoupled_loop(self):
+        # Drawn before the simulation starts, the render loop then only
+        # reads what the simulation publishes
+        self.__draw()
+        self.render_loop = RenderLoop(grid=self.grid, frame_buffer=self.frame_buffer,
+                                      frame_rate=self.frame_rate, interpolate=self.interpolate)
+        if self.metrics is not None:
+            self.render_loop.draw_frame = self.metrics.timed("render_frame", self.render_loop.draw_frame)
+        simulation_thread = Thread(target=self.__simulate, name="SimulationThread", daemon=True)
+        simulation_thread.start()
+
+        while self.game_state != GameState.GAME_STOPPED:
+            if not self.input_handler.reads_engine:
+                self.__get_inputs()
+            self.render_loop.draw_frame()
+            self.__export_metrics_if_due()
+
+            timeout = self.render_loop.time_until_next_frame()
+            if self.input_thread is None and not self.input_handler.reads_engine:
+                self.input_handler.wait_for_inputs(timeout)
+            else:
+                sleep(timeout)
+
+        simulation_thread.join()
+        self.render_loop.draw_frame()
+        self.__game_over()
 
     def start(self):
         self.game_state = GameState.GAME_RUNNING
         self.snake.direction = SnakeDirection.STOPPED
-        self.__game_loop()
+        if self.profiler is not None:
+            self.profiler.install_signal()
+        if self.input_thread is not None:
+            self.input_thread.start()
+        if self.frame_rate is None:
+            self.__game_loop()
+        else:
+            self.__decoupled_loop()
 
     def stop(self):
-        pass
+        if self.input_thread is not None:
+            self.input_thread.stop()
 
 
 def main():
+    # Only the interactive game needs rich, headless users of SnakeGame
+    # don't pay for importing it
+    from rich.logging import RichHandler
+
+    setup_logging(level=os.environ.get("SNAKE_LOG_LEVEL", "INFO"), handler=RichHandler())
+
     nb_col = 21
     nb_row = 21
     tile_size = 30
@@ -172,11 +309,23 @@ def main():
     renderer: Renderer = RendererFactory.get_renderer(**renderer_config)
     grid = Grid(row_count=nb_row, col_count=nb_col, renderer=renderer)
     snake = Snake(initial_x=10, initial_y=10)
-    input_handler = PygameKeyboardHandler()
+    input_handler = InputHandlerFactory.get_input_handler(
+        "autopilot" if os.environ.get("SNAKE_AUTOPILOT") else "keyboard")
     food_factory = FoodFactory()
 
+    seed = os.environ.get("SNAKE_SEED")
+    frame_rate = os.environ.get("SNAKE_FRAME_RATE")
+    metrics_path = os.environ.get("SNAKE_METRICS")
+    profile_path = os.environ.get("SNAKE_PROFILE")
+    profiler_kind = os.environ.get("SNAKE_PROFILER", "sampling")
     game_obj = SnakeGame(grid=grid, snake=snake,
-                         food_facory=food_factory, input_handler=input_handler, snake_speed=2)
+                         food_facory=food_factory, input_handler=input_handler, snake_speed=2,
+                         seed=int(seed) if seed else None,
+                         replay_path=os.environ.get("SNAKE_REPLAY"),
+                         frame_rate=float(frame_rate) if frame_rate else None,
+                         interpolate=bool(os.environ.get("SNAKE_INTERPOLATE")),
+                         metrics=Metrics() if metrics_path else None, metrics_path=metrics_path,
+                         profiler=PROFILERS[profiler_kind](path=profile_path) if profile_path else None)
 
     game_obj.start()
 
@@ -0,0 +1,36 @@
+from objects.autopilot import Autopilot
+from objects.engine import GameEngine, GameState
+
+
+class StepClock:
+    """Clock moving forward by step on every reading."""
+
+    def __init__(self, step: float) -> None:
+        self.step = step
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        self.now += self.step
+        return self.now
+
+
+def test_searches_carry_on_over_ticks():
+    engine = GameEngine.headless(row_count=300, col_count=300, seed=0)
+    autopilot = Autopilot(engine, clock=StepClock(1e-6))
+    while engine.snake.length == 1:
+        # Some 60 cells per tick, far from enough to reach the food
+        assert engine.step(autopilot.next_direction(time_budget=5e-6))[0] == GameState.GAME_RUNNING
+
+    assert autopilot.stats.partial_moves > 1
+    assert autopilot.stats.searches == 1
+    assert autopilot.stats.over_budget == 0
+
+
+def test_searches_without_budget_run_to_the_food():
+    engine = GameEngine.headless(row_count=300, col_count=300, seed=0)
+    autopilot = Autopilot(engine)
+    while engine.snake.length < 4:
+        engine.step(autopilot.next_direction())
+
+    assert autopilot.stats.partial_moves == 0
+    assert autopilot.stats.searches == 3
@@ -0,0 +1,85 @@
+from random import Random
+
+import numpy as np
+import pytest
+
+from objects.batch_engine import DIRECTION_CODES, KEEP_DIRECTION, BatchEngine
+from objects.engine import GameEngine, GameEvent, GameState
+from objects.snake import SnakeDirection
+
+BATCH_SIZE = 16
+TICKS = 300
+CYCLE = [SnakeDirection.UP, SnakeDirection.LEFT, SnakeDirection.DOWN, SnakeDirection.RIGHT]
+
+
+def body(engine: GameEngine):
+    return [(tile.x, tile.y) for tile in engine.snake.segments]
+
+
+def run_in_parallel(row_count: int, col_count: int, choose_action):
+    """Steps a BatchEngine and one GameEngine per game with the same
+    actions, the batch taking its food from the scalar engines."""
+    batch = BatchEngine(batch_size=BATCH_SIZE, row_count=row_count, col_count=col_count,
+                        seed=0, auto_reset=False)
+    engines = [GameEngine.headless(row_count=row_count, col_count=col_count, seed=seed)
+               for seed in range(BATCH_SIZE)]
+    for game, engine in enumerate(engines):
+        batch.set_food(game, engine.food.x, engine.food.y)
+    games_over = 0
+
+    for tick in range(TICKS):
+        actions = [choose_action(tick, game, engine) for game, engine in enumerate(engines)]
+        result = batch.step(np.array([KEEP_DIRECTION if action is None else DIRECTION_CODES[action]
+                                      for action in actions]))
+        for game, (engine, action) in enumerate(zip(engines, actions)):
+            if engine.game_state == GameState.GAME_STOPPED:
+                continue
+            length = engine.snake.length
+            _, event = engine.step(action)
+            # The snake eating the food that fills the grid ends the game
+            assert result.ate_food[game] == (engine.snake.length > length), (tick, game)
+            assert result.game_over[game] == (event == GameEvent.GAME_OVER), (tick, game)
+            assert DIRECTION_CODES[engine.snake.direction] == batch.direction[game], (tick, game)
+            if event == GameEvent.GAME_OVER:
+                assert result.final_length[game] == engine.snake.length
+                games_over += 1
+                # The scalar snake has made the fatal move, the batch one hasn't
+                continue
+            assert batch.body_positions(game) == body(engine), (tick, game)
+            assert batch.tick_count[game] == engine.tick_count
+            if event == GameEvent.SPEED_UP:
+                batch.set_food(game, engine.food.x, engine.food.y)
+            assert batch.food_position(game) == (engine.food.x, engine.food.y)
+    return engines, games_over
+
+
+@pytest.mark.parametrize("size", [(3, 3), (5, 8), (21, 21)])
+def test_random_actions_match_game_engine(size):
+    rngs = [Random(game) for game in range(BATCH_SIZE)]
+
+    def choose_action(tick, game, engine):
+        rng = rngs[game]
+        return rng.choice(list(DIRECTION_CODES)) if rng.random() < 0.3 else None
+
+    _, games_over = run_in_parallel(*size, choose_action)
+    assert games_over > 0
+
+
+def test_greedy_snakes_bite_themselves():
+    # Heading straight for the food grows long snakes, which then run into
+    # their own body rather than the walls
+    def choose_action(tick, game, engine):
+        if engine.food.x != engine.snake.x:
+            return SnakeDirection.RIGHT if engine.food.x > engine.snake.x else SnakeDirection.LEFT
+        return SnakeDirection.DOWN if engine.food.y > engine.snake.y else SnakeDirection.UP
+
+    engines, games_over = run_in_parallel(9, 9, choose_action)
+    assert games_over == BATCH_SIZE
+    assert max(engine.snake.length for engine in engines) > 4
+
+
+def test_filling_the_grid_ends_the_game():
+    # Circling a 2x2 grid eats every food until the snake fills it
+    engines, games_over = run_in_parallel(2, 2, lambda tick, game, engine: CYCLE[tick % len(CYCLE)])
+    assert games_over == BATCH_SIZE
+    assert all(engine.snake.length == 4 for engine in engines)
@@ -0,0 +1,104 @@
+from random import Random
+
+import pytest
+
+from objects.engine import GameEngine, GameSnapshot, GameState
+from objects.snake import SnakeDirection, SnakeTile
+
+DIRECTIONS = [SnakeDirection.UP, SnakeDirection.DOWN, SnakeDirection.LEFT, SnakeDirection.RIGHT]
+
+
+def random_actions(seed: int, count: int):
+    rng = Random(seed)
+    return [rng.choice(DIRECTIONS) if rng.random() < 0.3 else None for _ in range(count)]
+
+
+def occupied(engine: GameEngine):
+    """Positions the grid holds, which must be the body and the food."""
+    return sorted(divmod(index, engine.grid.col_count)[::-1] for index, _ in engine.grid.occupied_cells())
+
+
+def play(engine: GameEngine, actions):
+    hashes = list()
+    for action in actions:
+        engine.step(action)
+        hashes.append(engine.state_hash())
+    return hashes
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("serialize", [False, True])
+def test_restore_replays_identically(seed, serialize):
+    engine = GameEngine.headless(row_count=8, col_count=8, seed=seed)
+    # Food is eaten often on a small grid, so the free cells get shuffled
+    for action in random_actions(seed, 30):
+        if engine.step(action)[0] == GameState.GAME_STOPPED:
+            engine.reset(seed)
+    snapshot = engine.snapshot()
+    if serialize:
+        snapshot = GameSnapshot.from_bytes(snapshot.to_bytes())
+
+    actions = random_actions(seed + 100, 40)
+    expected = play(engine, actions)
+    engine.restore(snapshot)
+    assert play(engine, actions) == expected
+
+
+@pytest.mark.parametrize("direction", DIRECTIONS)
+@pytest.mark.parametrize("chunked", [False, True])
+def test_restore_after_leaving_the_grid(direction, chunked):
+    engine = GameEngine.headless(row_count=5, col_count=5, seed=0, chunked=chunked)
+    start = engine.snapshot()
+    while engine.step(direction)[0] != GameState.GAME_STOPPED:
+        pass
+    dead = engine.snapshot()
+    dead_hash = engine.state_hash()
+
+    engine.restore(dead)
+    assert engine.state_hash() == dead_hash
+    assert all(0 <= x < 5 and 0 <= y < 5 for x, y in engine.grid.empty_positions)
+
+    engine.restore(start)
+    assert len(engine.grid.empty_positions) == 5 * 5 - 2
+    assert occupied(engine) == sorted([(engine.snake.x, engine.snake.y), (engine.food.x, engine.food.y)])
+    assert engine.step(direction)[0] == GameState.GAME_RUNNING
+
+
+def test_snapshot_size_depends_on_length_only():
+    engine = GameEngine.headless(row_count=100, col_count=100, seed=0)
+    size = len(engine.snapshot().to_bytes())
+    # Spawning food over and over shuffles the free cells
+    for _ in range(5000):
+        engine.grid.remove_tile(x=engine.food.x, y=engine.food.y)
+        engine.food = engine.food_factory.spawn_food(engine.grid.empty_positions)
+        engine.grid.add_tile(engine.food)
+    assert len(engine.snapshot().to_bytes()) == size
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_chunked_grids_spawn_the_same_food(seed):
+    engines = [GameEngine.headless(row_count=6, col_count=7, seed=seed, chunked=chunked)
+               for chunked in (False, True)]
+    for action in random_actions(seed, 300):
+        states = [engine.step(action)[0] for engine in engines]
+        assert engines[0].state_hash() == engines[1].state_hash()
+        if states[0] == GameState.GAME_STOPPED:
+            for engine in engines:
+                engine.reset(seed)
+
+
+def test_nearly_full_grids_pick_the_same_free_cells():
+    free = [(1, 2), (4, 0), (6, 5)]
+    grids = [GameEngine.headless(row_count=6, col_count=7, chunked=chunked).grid for chunked in (False, True)]
+    # Rejection draws miss almost always, so picks fall back to the free
+    # cells in column-major order
+    for grid in grids:
+        grid.clear()
+        for x in range(7):
+            for y in range(6):
+                if (x, y) not in free:
+                    grid.add_tile(SnakeTile(x=x, y=y))
+    picks = [[grid.empty_positions.random_choice(Random(seed).randrange) for seed in range(50)]
+             for grid in grids]
+    assert picks[0] == picks[1]
+    assert set(picks[0]) == set(free)
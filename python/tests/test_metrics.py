@@ -0,0 +1,30 @@
+from random import Random
+
+from objects.metrics import LatencyHistogram
+
+MILLISECOND = 1_000_000
+
+
+def test_values_above_a_bound_are_not_counted_under_it():
+    histogram = LatencyHistogram()
+    # Same bucket as 1 ms, which is 8192 ns wide there
+    histogram.record(MILLISECOND + 5000)
+    assert histogram.cumulative_counts([MILLISECOND, 2 * MILLISECOND]) == [0, 1]
+
+
+def test_values_at_a_bound_are_counted_under_it():
+    histogram = LatencyHistogram()
+    histogram.record(MILLISECOND)
+    assert histogram.cumulative_counts([MILLISECOND - 1, MILLISECOND]) == [0, 1]
+
+
+def test_straddling_buckets_are_split_in_proportion():
+    histogram = LatencyHistogram()
+    rng = Random(0)
+    values = [rng.randrange(MILLISECOND // 2, 2 * MILLISECOND) for _ in range(20000)]
+    for value in values:
+        histogram.record(value)
+    bounds = [600_000, MILLISECOND, 1_500_000]
+    expected = [sum(value <= bound for value in values) for bound in bounds]
+    for count, exact in zip(histogram.cumulative_counts(bounds), expected):
+        assert abs(count - exact) <= len(values) / 100
@@ -0,0 +1,41 @@
+from objects.multiplayer import MultiplayerEngine, PlayerEvent
+from objects.snake import Snake, SnakeDirection, SnakeTile
+from objects.tiles import CellKind
+
+
+def place(engine: MultiplayerEngine, *bodies):
+    """One player per body, head first, on a grid without food until the
+    next step."""
+    for index, kind in list(engine.grid.occupied_cells()):
+        if kind == CellKind.FOOD:
+            engine.grid.remove_tile(*reversed(divmod(index, engine.grid.col_count)))
+    engine.food_count = 0
+    players = list()
+    for body in bodies:
+        player = engine.add_player()
+        player.snake = Snake(initial_x=body[0][0], initial_y=body[0][1],
+                             segments=[SnakeTile(x=x, y=y) for x, y in body])
+        for tile in player.snake.segments:
+            engine.grid.add_tile(tile)
+        players.append(player)
+    return players
+
+
+def test_head_on_swap_kills_both():
+    engine = MultiplayerEngine.headless(10, 10, seed=0, respawn_delay=100)
+    left, right = place(engine, [(4, 5)], [(5, 5)])
+    engine.push_direction(left, SnakeDirection.RIGHT)
+    engine.push_direction(right, SnakeDirection.LEFT)
+
+    events = engine.step()
+    assert (left, PlayerEvent.DIED) in events and (right, PlayerEvent.DIED) in events
+
+
+def test_following_a_tail_is_allowed():
+    engine = MultiplayerEngine.headless(10, 10, seed=0, respawn_delay=100)
+    leader, follower = place(engine, [(5, 5)], [(4, 5)])
+    engine.push_direction(leader, SnakeDirection.RIGHT)
+    engine.push_direction(follower, SnakeDirection.RIGHT)
+
+    assert engine.step() == []
+    assert (follower.snake.x, follower.snake.y) == (5, 5)
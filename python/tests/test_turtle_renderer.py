@@ -0,0 +1,108 @@
+from random import Random
+
+import pytest
+
+from objects.bots import greedy_bot
+from objects.engine import GameEngine, GameState
+from objects.food import FoodFactory
+from objects.grid import Grid
+from objects.render_loop import FrameBuffer, RenderLoop
+from objects.renderers import turtle_renderer
+from objects.renderers.turtle_renderer import TurtleRenderer
+from objects.snake import Snake
+
+COL_COUNT = ROW_COUNT = 10
+TILE_SIZE = 20
+
+
+class StubCanvas:
+    """The Tk canvas calls TurtleRenderer makes, without a display."""
+
+    def __init__(self) -> None:
+        self.items = dict()
+        self.next_item = 1
+
+    def create_polygon(self, *coords, **options) -> int:
+        item = self.next_item
+        self.next_item += 1
+        self.items[item] = {"coords": coords, **options}
+        return item
+
+    def coords(self, item: int, *coords):
+        self.items[item]["coords"] = coords
+
+    def itemconfigure(self, item: int, **options):
+        self.items[item].update(options)
+
+    def delete(self, item: int):
+        del self.items[item]
+
+    def find_all(self):
+        return tuple(self.items)
+
+
+class StubScreen:
+    def __init__(self) -> None:
+        self.canvas = StubCanvas()
+        self.updates = 0
+
+    def title(self, _):
+        pass
+
+    def bgcolor(self, _):
+        pass
+
+    def setup(self, **_):
+        pass
+
+    def tracer(self, _):
+        pass
+
+    def getcanvas(self) -> StubCanvas:
+        return self.canvas
+
+    def update(self):
+        self.updates += 1
+
+
+@pytest.fixture
+def renderer(monkeypatch) -> TurtleRenderer:
+    monkeypatch.setattr(turtle_renderer.turtle, "Screen", StubScreen)
+    return TurtleRenderer(window_width=COL_COUNT * TILE_SIZE, window_height=ROW_COUNT * TILE_SIZE)
+
+
+def test_item_count_stays_flat(renderer):
+    grid = Grid(row_count=ROW_COUNT, col_count=COL_COUNT, renderer=renderer)
+    engine = GameEngine(grid=grid, snake=Snake(initial_x=5, initial_y=5),
+                        food_factory=FoodFactory(), seed=0)
+    rng = Random(0)
+    grid.draw()
+    resets = 0
+    for _ in range(2000):
+        if engine.step(greedy_bot(engine, rng))[0] == GameState.GAME_STOPPED:
+            engine.reset(seed=resets)
+            resets += 1
+        grid.draw()
+        assert renderer.item_count <= COL_COUNT * ROW_COUNT
+
+    assert resets > 0
+    # Every item belongs to a cell, none was leaked by a redraw
+    assert sorted(renderer.cell_items.values()) == sorted(renderer.canvas.find_all())
+    assert renderer.window.updates == 2001
+
+
+def test_reset_frame_deletes_items(renderer):
+    grid = Grid(row_count=ROW_COUNT, col_count=COL_COUNT, renderer=renderer)
+    GameEngine(grid=grid, snake=Snake(initial_x=5, initial_y=5), food_factory=FoodFactory(), seed=0)
+    grid.draw()
+    assert renderer.item_count == 2
+
+    renderer.reset_frame()
+    assert renderer.item_count == 0
+
+
+def test_render_loop_does_not_interpolate(renderer):
+    grid = Grid(row_count=ROW_COUNT, col_count=COL_COUNT, renderer=renderer)
+    # Sliding tiles would each create an item at their pixel position
+    render_loop = RenderLoop(grid=grid, frame_buffer=FrameBuffer(), interpolate=True)
+    assert not render_loop.interpolate
@@ -0,0 +1,151 @@
+#! python3
+"""Runs bot strategies against each other on many seeded headless games"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from hashlib import blake2b
+from random import Random
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from objects.bots import STRATEGIES
+from objects.engine import GameEngine, GameState
+
+
+@dataclass(frozen=True)
+class Match:
+    strategy: str
+    board_size: int
+    seed: int
+    max_ticks: int
+
+
+@dataclass
+class MatchResult:
+    strategy: str
+    board_size: int
+    seed: int
+    score: int
+    length: int
+    ticks: int
+
+
+@dataclass
+class StrategyStats:
+    games: int = 0
+    total_score: int = 0
+    best_score: int = 0
+    total_length: int = 0
+    total_ticks: int = 0
+
+    def add(self, result: MatchResult):
+        self.games += 1
+        self.total_score += result.score
+        self.best_score = max(self.best_score, result.score)
+        self.total_length += result.length
+        self.total_ticks += result.ticks
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "games": self.games,
+            "mean_score": self.total_score / self.games,
+            "best_score": self.best_score,
+            "mean_length": self.total_length / self.games,
+            "mean_ticks": self.total_ticks / self.games,
+            "total_ticks": self.total_ticks,
+        }
+
+
+def game_seed(base_seed: int, board_size: int, game_index: int) -> int:
+    # Every strategy plays the same seeds, and a seed only depends on the
+    # game it belongs to, never on which worker plays it
+    digest = blake2b(f"{base_seed}:{board_size}:{game_index}".encode(), digest_size=8)
+    return int.from_bytes(digest.digest(), "little")
+
+
+def build_matches(strategies: List[str], board_sizes: List[int],
+                  games: int, base_seed: int, max_ticks: int) -> List[Match]:
+    return [Match(strategy=strategy, board_size=board_size,
+                  seed=game_seed(base_seed, board_size, game_index), max_ticks=max_ticks)
+            for strategy in strategies
+            for board_size in board_sizes
+            for game_index in range(games)]
+
+
+def play_match(match: Match) -> MatchResult:
+    engine = GameEngine.headless(row_count=match.board_size,
+                                 col_count=match.board_size, seed=match.seed)
+    strategy = STRATEGIES[match.strategy]
+    rng = Random(match.seed)
+
+    while engine.tick_count < match.max_ticks:
+        game_state, _ = engine.step(strategy(engine, rng))
+        if game_state == GameState.GAME_STOPPED:
+            break
+
+    return MatchResult(strategy=match.strategy, board_size=match.board_size,
+                       seed=match.seed, score=engine.snake.length - 1,
+                       length=engine.snake.length, ticks=engine.tick_count)
+
+
+def play_matches(matches: List[Match], workers: int, chunksize: int) -> Iterator[MatchResult]:
+    if workers <= 1:
+        yield from map(play_match, matches)
+        return
+
+    if chunksize <= 0:
+        # A few chunks per worker amortizes IPC while keeping workers busy
+        chunksize = max(1, len(matches) // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map() yields in submission order, so aggregation doesn't depend on
+        # the number of workers
+        yield from executor.map(play_match, matches, chunksize=chunksize)
+
+
+def aggregate(results: Iterable[MatchResult]) -> Dict[Tuple[str, int], StrategyStats]:
+    stats: Dict[Tuple[str, int], StrategyStats] = dict()
+    for result in results:
+        stats.setdefault((result.strategy, result.board_size), StrategyStats()).add(result)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--strategies", nargs="+", default=sorted(STRATEGIES),
+                        choices=sorted(STRATEGIES))
+    parser.add_argument("--board-sizes", nargs="+", type=int, default=[21])
+    parser.add_argument("--games", type=int, default=100,
+                        help="games per strategy and board size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ticks", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunksize", type=int, default=0,
+                        help="matches sent to a worker at once, 0 to pick automatically")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    matches = build_matches(args.strategies, args.board_sizes,
+                            args.games, args.seed, args.max_ticks)
+    stats = aggregate(play_matches(matches, args.workers, args.chunksize))
+
+    report = [{"strategy": strategy, "board_size": board_size, **strategy_stats.summary()}
+              for (strategy, board_size), strategy_stats in stats.items()]
+
+    for line in report:
+        print(f"{line['strategy']:>10} {line['board_size']:>5}x{line['board_size']:<5} "
+              f"games: {line['games']:>6} mean score: {line['mean_score']:>8.2f} "
+              f"best: {line['best_score']:>5} mean ticks: {line['mean_ticks']:>9.1f}")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({"config": vars(args), "results": report}, output, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())